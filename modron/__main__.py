@@ -1,4 +1,6 @@
 import argparse
+import asyncio
+import importlib
 import os
 import sys
 from pathlib import Path
@@ -7,7 +9,10 @@ import crescent
 import flare
 import hikari
 
+from modron import gateway, launcher
 from modron.config import Config
+from modron.db import migrate
+from modron.db.conn import connect
 from modron.exceptions import ModronError
 from modron.model import Model
 
@@ -16,6 +21,22 @@ parser = argparse.ArgumentParser(prog="Modron", description="CLI for running the
 parser.add_argument(
     "-c", "--config", type=Path, help="path to the config file", default=Path("config.yml"), dest="config"
 )
+parser.add_argument(
+    "command",
+    nargs="?",
+    choices=["run", "migrate", "worker"],
+    default="run",
+    help="run the bot (default), apply pending database migrations and exit, or run a range of shards",
+)
+parser.add_argument(
+    "--shards",
+    type=lambda ids: [int(i) for i in ids.split(",")],
+    help="comma separated shard ids for a worker, started by the supervisor",
+)
+parser.add_argument("--shard-count", type=int, help="total shards across every worker")
+parser.add_argument(
+    "--worker-index", type=int, default=0, help="position of a worker among the others, offsetting its metrics port"
+)
 args = parser.parse_args()
 
 # install uvloop if available
@@ -31,16 +52,57 @@ if not args.config.exists() or not args.config.is_file():
 # load config
 config = Config.load(args.config)
 
+
+async def apply_migrations() -> None:
+    pool = await connect(config.db_url, config.pool)
+    try:
+        applied = await migrate.apply(pool)
+    finally:
+        await pool.close()
+
+    for migration in applied:
+        print(f"applied {migration.version:04} {migration.name}")
+    if not applied:
+        print("database is up to date")
+
+
+if args.command == "migrate":
+    asyncio.run(apply_migrations())
+    sys.exit()
+
+if args.command == "worker" and (args.shards is None or args.shard_count is None):
+    sys.exit("worker requires --shards and --shard-count")
+
+# with several processes, this one only supervises the workers
+if args.command == "run" and config.shards.processes > 1:
+    launcher.run(args.config, config)
+    sys.exit()
+
 # create global model
-model = Model(config)
+model = Model(config, args.worker_index)
 
 # initialize bot, plugins, and hikari extension libraries
 bot = hikari.GatewayBot(
     token=config.discord_token,
+    intents=gateway.intents(config.gateway),
+    cache_settings=gateway.cache_settings(config.gateway),
 )
 flare.install(bot)
-client = crescent.Client(bot, model=model)
-client.plugins.load("modron.plugins.feedback")
+client = crescent.Client(
+    bot,
+    model=model,
+    command_hooks=[model.metrics.interactions.before_command],
+    command_after_hooks=[model.metrics.interactions.after_command],
+)
+
+plugins = ["modron.plugins.feedback"]
+for path in plugins:
+    client.plugins.load(path)
+
+# time the components and modals of each plugin, when metrics are served
+if config.metrics.port:
+    for path in plugins:
+        model.metrics.interactions.time_components(importlib.import_module(path))
 
 
 @bot.listen()
@@ -48,7 +110,15 @@ async def on_start(_: hikari.StartingEvent) -> None:
     """
     While the bot is starting, initialize async resources such as database connections.
     """
-    await model.start(bot.rest)
+    await model.start(bot.rest, bot.cache)
+
+
+@bot.listen()
+async def on_stop(_: hikari.StoppingEvent) -> None:
+    """
+    While the bot is stopping, and its REST client is still open, finish menu moves and close async resources.
+    """
+    await model.close()
 
 
 @bot.listen(hikari.ExceptionEvent)
@@ -78,4 +148,7 @@ async def on_modron_command_error(exc: ModronError, ctx: crescent.Context) -> No
 
 
 # run forever
-bot.run()
+if args.command == "worker":
+    bot.run(shard_ids=args.shards, shard_count=args.shard_count)
+else:
+    bot.run(shard_count=config.shards.count or None)
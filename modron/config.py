@@ -1,21 +1,163 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import yaml
 
 
+@dataclass
+class CacheConfig:
+    # maximum number of model objects kept in memory. 0 disables the cache.
+    max_size: int = 1024
+    # seconds before a cached object is fetched from the database again
+    ttl: float = 300.0
+    # number of guilds whose autocomplete data is kept in memory. 0 serves autocomplete from the database.
+    autocomplete_guilds: int = 0
+    # members fetched over REST, kept for guilds the gateway cache doesn't cover. 0 disables.
+    members: int = 4096
+    # seconds before a fetched member is fetched again
+    member_ttl: float = 60.0
+    # share invalidations with other processes over postgres LISTEN/NOTIFY, using one extra connection.
+    # always on when shards.processes is more than 1. enable it when running several deployments instead.
+    notify: bool = False
+
+    def __post_init__(self) -> None:
+        if self.max_size < 0:
+            raise ValueError("cache.max_size can't be negative")
+        if self.ttl < 0:
+            raise ValueError("cache.ttl can't be negative")
+        if self.autocomplete_guilds < 0:
+            raise ValueError("cache.autocomplete_guilds can't be negative")
+        if self.members < 0:
+            raise ValueError("cache.members can't be negative")
+        if self.member_ttl < 0:
+            raise ValueError("cache.member_ttl can't be negative")
+
+
+@dataclass
+class PoolConfig:
+    # connections opened at startup, and the most that are ever open at once
+    min_size: int = 10
+    max_size: int = 10
+    # seconds an idle connection is kept before it is closed. 0 keeps them forever.
+    max_inactive_connection_lifetime: float = 300.0
+    # prepared statements kept per connection. 0 disables the cache, which is required behind pgbouncer.
+    statement_cache_size: int = 100
+    # seconds before a query is cancelled. None waits forever.
+    command_timeout: float | None = None
+    # postgres settings applied to every connection
+    server_settings: dict[str, str] = field(
+        default_factory=lambda: {"application_name": "modron", "jit": "off"},
+    )
+
+    def __post_init__(self) -> None:
+        if self.max_size < 1:
+            raise ValueError(f"pool.max_size must be at least 1, not {self.max_size}")
+        if not 0 <= self.min_size <= self.max_size:
+            raise ValueError(f"pool.min_size must be between 0 and max_size ({self.max_size}), not {self.min_size}")
+        if self.max_inactive_connection_lifetime < 0:
+            raise ValueError("pool.max_inactive_connection_lifetime can't be negative")
+        if self.statement_cache_size < 0:
+            raise ValueError("pool.statement_cache_size can't be negative")
+        if self.command_timeout is not None and self.command_timeout <= 0:
+            raise ValueError("pool.command_timeout must be positive")
+
+        # YAML reads `off` and `on` as booleans, but postgres expects strings
+        self.server_settings = {
+            str(k): ("on" if v else "off") if isinstance(v, bool) else str(v) for k, v in self.server_settings.items()
+        }
+
+
+@dataclass
+class MetricsConfig:
+    # DB methods taking longer than this many seconds, including waiting for a connection, are logged. 0 disables.
+    slow_query_seconds: float = 0.25
+    # serve prometheus metrics at http://host:port/metrics. 0 disables the exporter.
+    # with several shard processes, each serves its own shards' metrics on the ports from this one upwards.
+    port: int = 0
+    host: str = "127.0.0.1"
+
+    def __post_init__(self) -> None:
+        if self.slow_query_seconds < 0:
+            raise ValueError("metrics.slow_query_seconds can't be negative")
+        if not 0 <= self.port <= 65535:
+            raise ValueError(f"metrics.port must be between 0 and 65535, not {self.port}")
+
+
+@dataclass
+class GatewayConfig:
+    # "full" uses hikari's defaults. "minimal" subscribes to and caches only guilds, roles and the bot user,
+    # which saves memory on large shards. without `members` it caches no members, so every member is fetched instead.
+    profile: str = "full"
+    # request the privileged members intent and cache members. it must also be enabled in the developer portal.
+    # game role syncs only skip members who already have the role when their roles are cached or can be listed.
+    members: bool = False
+
+    def __post_init__(self) -> None:
+        if self.profile not in ("minimal", "full"):
+            raise ValueError(f"gateway.profile must be 'minimal' or 'full', not {self.profile!r}")
+
+
+@dataclass
+class ShardConfig:
+    # total shards across every process. 0 uses discord's recommendation.
+    count: int = 0
+    # worker processes, each running a range of the shards with its own database pool.
+    # with more than 1, `python -m modron` supervises the workers and restarts any that crash.
+    processes: int = 1
+
+    def __post_init__(self) -> None:
+        if self.count < 0:
+            raise ValueError("shards.count can't be negative")
+        if self.processes < 1:
+            raise ValueError(f"shards.processes must be at least 1, not {self.processes}")
+        if self.count and self.processes > self.count:
+            raise ValueError(f"shards.processes ({self.processes}) can't be more than shards.count ({self.count})")
+
+
+@dataclass
+class FeedbackConfig:
+    # seconds a feedback channel's menu waits before moving below new posts, so that a burst of posts moves it
+    # once. 0 moves it right away.
+    menu_delay: float = 3.0
+
+    def __post_init__(self) -> None:
+        if self.menu_delay < 0:
+            raise ValueError("feedback.menu_delay can't be negative")
+
+
 @dataclass
 class Config:
     discord_token: str
 
     db_url: str
 
+    cache: CacheConfig = field(default_factory=CacheConfig)
+    pool: PoolConfig = field(default_factory=PoolConfig)
+    metrics: MetricsConfig = field(default_factory=MetricsConfig)
+    gateway: GatewayConfig = field(default_factory=GatewayConfig)
+    shards: ShardConfig = field(default_factory=ShardConfig)
+    feedback: FeedbackConfig = field(default_factory=FeedbackConfig)
+
+    def __post_init__(self) -> None:
+        if self.metrics.port and self.metrics.port + self.shards.processes - 1 > 65535:
+            raise ValueError(
+                f"metrics.port ({self.metrics.port}) leaves no room for a port per shard process "
+                f"({self.shards.processes})"
+            )
+
     @classmethod
     def load(cls, path: Path) -> Config:
         with path.open("r") as f:
             # this has to be type ignored for now, as there is an issue with types-pyyaml
             config = yaml.load(f.read(), yaml.Loader)  # type: ignore
 
-        return cls(**config)
+        cache = CacheConfig(**(config.pop("cache", None) or {}))
+        pool = PoolConfig(**(config.pop("pool", None) or {}))
+        metrics = MetricsConfig(**(config.pop("metrics", None) or {}))
+        gateway = GatewayConfig(**(config.pop("gateway", None) or {}))
+        shards = ShardConfig(**(config.pop("shards", None) or {}))
+        feedback = FeedbackConfig(**(config.pop("feedback", None) or {}))
+
+        return cls(**config, cache=cache, pool=pool, metrics=metrics, gateway=gateway, shards=shards, feedback=feedback)
@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import collections
+import functools
+import typing
+
+import crescent
+import hikari
+import toolbox
+
+from modron.db.cache import ModelCache, Tag
+from modron.db.conn import Conn, DBConn, Pool, with_conn
+from modron.metrics import QueryMetrics
+
+LIMIT = 25
+
+
+class GameEntry(typing.NamedTuple):
+    name: str
+    author_id: int
+    seeking_players: bool
+
+
+class CharacterEntry(typing.NamedTuple):
+    name: str
+    author_id: int
+
+
+def _prefixed(keys: list[tuple[str, int]], prefix: str) -> typing.Iterator[int]:
+    """
+    Yield the ids of sorted `(key, id)` pairs whose key starts with `prefix`, without repeating an id.
+    """
+    seen: set[int] = set()
+    for key, item_id in keys[bisect.bisect_left(keys, (prefix,)) :]:
+        if not key.startswith(prefix):
+            return
+        if item_id not in seen:
+            seen.add(item_id)
+            yield item_id
+
+
+class GuildIndex:
+    """
+    The names and abbreviations of one guild's games, systems, and characters, sorted for prefix search.
+    Also holds which users play in which games, for the autocompletes that depend on membership.
+    """
+
+    def __init__(self) -> None:
+        self.games: dict[int, GameEntry] = {}
+        self.game_keys: list[tuple[str, int]] = []
+
+        self.systems: dict[int, str] = {}
+        self.system_keys: list[tuple[str, int]] = []
+
+        # only characters assigned to a player are visible to autocomplete
+        self.characters: dict[int, CharacterEntry] = {}
+        self.character_keys: list[tuple[str, int]] = []
+
+        # user_id -> game_ids
+        self.memberships: dict[int, set[int]] = {}
+        # character_id -> user_ids
+        self.character_players: dict[int, set[int]] = {}
+
+    def search_games(
+        self, option: hikari.AutocompleteInteractionOption, predicate: typing.Callable[[int, GameEntry], bool]
+    ) -> list[tuple[str, str]]:
+        results: list[tuple[str, str]] = []
+        for game_id in _prefixed(self.game_keys, str(option.value).lower()):
+            game = self.games[game_id]
+            if predicate(game_id, game):
+                results.append((game.name, str(game_id)))
+                if len(results) == LIMIT:
+                    break
+        return results
+
+    def games_guild(
+        self, ctx: crescent.AutocompleteContext, option: hikari.AutocompleteInteractionOption
+    ) -> list[tuple[str, str]]:
+        return self.search_games(option, lambda _, __: True)
+
+    def games_editable(
+        self, ctx: crescent.AutocompleteContext, option: hikari.AutocompleteInteractionOption
+    ) -> list[tuple[str, str]]:
+        assert ctx.member is not None
+        perms = toolbox.members.calculate_permissions(ctx.member)
+        if (perms & hikari.Permissions.MANAGE_GUILD) == hikari.Permissions.MANAGE_GUILD:
+            return self.search_games(option, lambda _, __: True)
+        return self.search_games(option, lambda _, game: game.author_id == ctx.user.id)
+
+    def games_joinable(
+        self, ctx: crescent.AutocompleteContext, option: hikari.AutocompleteInteractionOption
+    ) -> list[tuple[str, str]]:
+        joined = self.memberships.get(ctx.user.id, set())
+        return self.search_games(
+            option,
+            lambda game_id, game: game.author_id != ctx.user.id and game.seeking_players and game_id not in joined,
+        )
+
+    def games_joined(
+        self, ctx: crescent.AutocompleteContext, option: hikari.AutocompleteInteractionOption
+    ) -> list[tuple[str, str]]:
+        joined = self.memberships.get(ctx.user.id, set())
+        return self.search_games(option, lambda game_id, _: game_id in joined)
+
+    def games_involved(
+        self, ctx: crescent.AutocompleteContext, option: hikari.AutocompleteInteractionOption
+    ) -> list[tuple[str, str]]:
+        joined = self.memberships.get(ctx.user.id, set())
+        return self.search_games(option, lambda game_id, game: game.author_id == ctx.user.id or game_id in joined)
+
+    def systems_guild(
+        self, ctx: crescent.AutocompleteContext, option: hikari.AutocompleteInteractionOption
+    ) -> list[tuple[str, str]]:
+        ids = _prefixed(self.system_keys, str(option.value).lower())
+        return [(self.systems[system_id], str(system_id)) for _, system_id in zip(range(LIMIT), ids)]
+
+    def search_characters(
+        self, option: hikari.AutocompleteInteractionOption, predicate: typing.Callable[[int, CharacterEntry], bool]
+    ) -> list[hikari.CommandChoice]:
+        results: list[hikari.CommandChoice] = []
+        for character_id in _prefixed(self.character_keys, str(option.value).lower()):
+            character = self.characters[character_id]
+            if predicate(character_id, character):
+                results.append(hikari.CommandChoice(name=character.name, value=str(character_id)))
+                if len(results) == LIMIT:
+                    break
+        return results
+
+    def characters_viewable(
+        self, ctx: crescent.AutocompleteContext, option: hikari.AutocompleteInteractionOption
+    ) -> list[hikari.CommandChoice]:
+        return self.search_characters(option, lambda _, __: True)
+
+    def characters_editable(
+        self, ctx: crescent.AutocompleteContext, option: hikari.AutocompleteInteractionOption
+    ) -> list[hikari.CommandChoice]:
+        return self.search_characters(
+            option,
+            lambda character_id, character: character.author_id == ctx.user.id
+            or ctx.user.id in self.character_players.get(character_id, set()),
+        )
+
+
+class AutocompleteIndex(DBConn):
+    """
+    Serves autocomplete from memory, so that keystrokes don't wait on Postgres.
+
+    A guild is loaded on its first autocomplete, and the `max_guilds` most recently used guilds are kept.
+    Writes invalidate tags on the model cache, and any guild containing an invalidated row is dropped
+    and loaded again on its next autocomplete.
+    """
+
+    def __init__(self, pool: Pool, cache: ModelCache, max_guilds: int, *, metrics: QueryMetrics | None = None) -> None:
+        super().__init__(pool, cache, metrics=metrics)
+        self.max_guilds = max_guilds
+
+        self.guilds: collections.OrderedDict[int, GuildIndex] = collections.OrderedDict()
+        self.loading: dict[int, asyncio.Task[GuildIndex]] = {}
+        # which guild a row belongs to, for loaded guilds only
+        self.owners: dict[Tag, int] = {}
+
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+
+        cache.subscribe(self.invalidate)
+
+    async def get(self, guild_id: int) -> GuildIndex:
+        guild = self.guilds.get(guild_id)
+        if guild is not None:
+            self.guilds.move_to_end(guild_id)
+            self.hits += 1
+            return guild
+
+        self.misses += 1
+        task = self.loading.get(guild_id)
+        if task is None:
+            task = asyncio.create_task(self._load(guild_id))
+            self.loading[guild_id] = task
+            task.add_done_callback(lambda _: self.loading.pop(guild_id, None))
+
+        # several keystrokes may be waiting on the same load, so one being cancelled shouldn't cancel it
+        return await asyncio.shield(task)
+
+    def invalidate(self, tags: tuple[Tag, ...] | None) -> None:
+        self.generation += 1
+        if tags is None:
+            self.guilds.clear()
+            self.owners.clear()
+            return
+
+        for tag in tags:
+            guild_id = tag[1] if tag[0] == "guild" else self.owners.get(tag)
+            if guild_id is not None:
+                self._drop(guild_id)
+
+    async def _load(self, guild_id: int) -> GuildIndex:
+        generation = self.generation
+        guild = await self.fetch(guild_id=guild_id)
+
+        # a write during the load may not be reflected, so it is used once but not kept
+        if generation == self.generation:
+            self._store(guild_id, guild)
+
+        return guild
+
+    def _store(self, guild_id: int, guild: GuildIndex) -> None:
+        self.guilds[guild_id] = guild
+        self.owners.update({("game", game_id): guild_id for game_id in guild.games})
+        self.owners.update({("system", system_id): guild_id for system_id in guild.systems})
+        self.owners.update({("character", character_id): guild_id for character_id in guild.characters})
+
+        while len(self.guilds) > self.max_guilds:
+            self._drop(next(iter(self.guilds)))
+
+    def _drop(self, guild_id: int) -> None:
+        guild = self.guilds.pop(guild_id, None)
+        if guild is None:
+            return
+
+        for game_id in guild.games:
+            self.owners.pop(("game", game_id), None)
+        for system_id in guild.systems:
+            self.owners.pop(("system", system_id), None)
+        for character_id in guild.characters:
+            self.owners.pop(("character", character_id), None)
+
+    @with_conn
+    async def fetch(self, conn: Conn, *, guild_id: int) -> GuildIndex:
+        guild = GuildIndex()
+
+        for r in await conn.fetch(
+            """
+            SELECT game_id, name, abbreviation, author_id, seeking_players
+            FROM Games
+            WHERE guild_id = $1;
+            """,
+            guild_id,
+        ):
+            guild.games[r["game_id"]] = GameEntry(r["name"], r["author_id"], r["seeking_players"])
+            guild.game_keys += [(r["name"].lower(), r["game_id"]), (r["abbreviation"].lower(), r["game_id"])]
+
+        for r in await conn.fetch(
+            """
+            SELECT system_id, name, abbreviation
+            FROM Systems
+            WHERE guild_id = $1;
+            """,
+            guild_id,
+        ):
+            guild.systems[r["system_id"]] = r["name"]
+            guild.system_keys += [(r["name"].lower(), r["system_id"]), (r["abbreviation"].lower(), r["system_id"])]
+
+        for r in await conn.fetch(
+            """
+            SELECT p.user_id, p.game_id, p.character_id
+            FROM Players AS p
+            INNER JOIN Games AS g USING (game_id)
+            WHERE g.guild_id = $1;
+            """,
+            guild_id,
+        ):
+            guild.memberships.setdefault(r["user_id"], set()).add(r["game_id"])
+            if r["character_id"] is not None:
+                guild.character_players.setdefault(r["character_id"], set()).add(r["user_id"])
+
+        for r in await conn.fetch(
+            """
+            SELECT c.character_id, c.name, c.author_id
+            FROM Characters AS c
+            WHERE c.character_id = ANY($1::int[]);
+            """,
+            list(guild.character_players),
+        ):
+            guild.characters[r["character_id"]] = CharacterEntry(r["name"], r["author_id"])
+            guild.character_keys.append((r["name"].lower(), r["character_id"]))
+
+        guild.game_keys.sort()
+        guild.system_keys.sort()
+        guild.character_keys.sort()
+
+        return guild
+
+
+class IndexAware(typing.Protocol):
+    index: AutocompleteIndex | None
+
+
+SelfT = typing.TypeVar("SelfT", bound=IndexAware)
+ResultT = typing.TypeVar("ResultT")
+AutocompleteT = typing.Callable[
+    [SelfT, crescent.AutocompleteContext, hikari.AutocompleteInteractionOption],
+    typing.Coroutine[typing.Any, typing.Any, ResultT],
+]
+
+
+def indexed(
+    search: typing.Callable[
+        [GuildIndex, crescent.AutocompleteContext, hikari.AutocompleteInteractionOption],
+        ResultT,
+    ]
+) -> typing.Callable[[AutocompleteT[SelfT, ResultT]], AutocompleteT[SelfT, ResultT]]:
+    """
+    Answer an autocomplete with `search` on the guild's in-memory index when it is enabled.
+    Otherwise, the wrapped query runs as usual. This should be applied outside of `with_conn`.
+    """
+
+    def decorator(f: AutocompleteT[SelfT, ResultT]) -> AutocompleteT[SelfT, ResultT]:
+        @functools.wraps(f)
+        async def inner(
+            self: SelfT, ctx: crescent.AutocompleteContext, option: hikari.AutocompleteInteractionOption
+        ) -> ResultT:
+            if self.index is None or ctx.guild_id is None:
+                return await f(self, ctx, option)
+
+            return search(await self.index.get(ctx.guild_id), ctx, option)
+
+        return inner
+
+    return decorator
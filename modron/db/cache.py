@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import collections
+import functools
+import inspect
+import time
+import typing
+
+Key = tuple[typing.Hashable, ...]
+Tag = tuple[str, int]
+
+
+class _Missing:
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+class _Entry(typing.NamedTuple):
+    expires_at: float
+    value: typing.Any
+    tags: frozenset[Tag]
+
+
+class ModelCache:
+    """
+    A bounded LRU cache of model objects, with entries expiring after `ttl` seconds.
+
+    Each entry is tagged with the rows it was built from, e.g. `("game", 1)` or `("character", 5)`.
+    Writes invalidate tags rather than keys, which evicts every entry that depends on the written row.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300.0) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self.entries: collections.OrderedDict[Key, _Entry] = collections.OrderedDict()
+        self.tagged: dict[Tag, set[Key]] = {}
+
+        # bumped on every invalidation, so that reads that started before a write don't cache stale results
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+
+        self.listeners: list[typing.Callable[[tuple[Tag, ...] | None], None]] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, key: Key) -> typing.Any | _Missing:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+
+        if entry.expires_at < time.monotonic():
+            self._evict(key)
+            self.misses += 1
+            return MISSING
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def set(self, key: Key, value: typing.Any, tags: typing.Iterable[Tag], *, generation: int | None = None) -> None:
+        if not self.enabled:
+            return
+        if generation is not None and generation != self.generation:
+            return
+
+        if key in self.entries:
+            self._evict(key)
+
+        entry = _Entry(time.monotonic() + self.ttl, value, frozenset(tags))
+        self.entries[key] = entry
+        for tag in entry.tags:
+            self.tagged.setdefault(tag, set()).add(key)
+
+        while len(self.entries) > self.max_size:
+            self._evict(next(iter(self.entries)))
+
+    def subscribe(self, listener: typing.Callable[[tuple[Tag, ...] | None], None]) -> None:
+        """
+        Call `listener` with the invalidated tags whenever `invalidate` is called, or with None on `clear`.
+        """
+        self.listeners.append(listener)
+
+    def invalidate(self, *tags: Tag) -> None:
+        self.generation += 1
+        for tag in tags:
+            for key in self.tagged.pop(tag, set()):
+                self._evict(key)
+
+        for listener in self.listeners:
+            listener(tags)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self.entries.clear()
+        self.tagged.clear()
+
+        for listener in self.listeners:
+            listener(None)
+
+    def _evict(self, key: Key) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+
+        for tag in entry.tags:
+            keys = self.tagged.get(tag)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self.tagged[tag]
+
+
+class CacheAware(typing.Protocol):
+    cache: ModelCache
+
+
+SpecT = typing.ParamSpec("SpecT")
+ReturnT = typing.TypeVar("ReturnT")
+SelfT = typing.TypeVar("SelfT", bound=CacheAware)
+
+
+def cached(
+    kind: str, *params: str, tags: typing.Callable[[ReturnT], typing.Iterable[Tag]], refresh: bool = False
+) -> typing.Callable[
+    [typing.Callable[typing.Concatenate[SelfT, SpecT], typing.Coroutine[typing.Any, typing.Any, ReturnT]]],
+    typing.Callable[typing.Concatenate[SelfT, SpecT], typing.Coroutine[typing.Any, typing.Any, ReturnT]],
+]:
+    """
+    Serve a DB read from `self.cache` when possible.
+    The key is `kind` followed by the values of the keyword arguments named in `params`, or their defaults.
+    This should be applied outside of `with_conn`, so that a hit doesn't acquire a connection.
+
+    With `refresh=True` the wrapped method always runs, and its result replaces the cached value.
+    This is used by write methods that return the updated model, which leave invalidating its tags to this.
+    """
+
+    def decorator(
+        f: typing.Callable[typing.Concatenate[SelfT, SpecT], typing.Coroutine[typing.Any, typing.Any, ReturnT]]
+    ) -> typing.Callable[typing.Concatenate[SelfT, SpecT], typing.Coroutine[typing.Any, typing.Any, ReturnT]]:
+        parameters = inspect.signature(f).parameters
+        defaults = {p: parameters[p].default for p in params if parameters[p].default is not inspect.Parameter.empty}
+
+        @functools.wraps(f)
+        async def inner(self: SelfT, *args: SpecT.args, **kwargs: SpecT.kwargs) -> ReturnT:
+            key = (kind, *(kwargs[p] if p in kwargs else defaults[p] for p in params))
+
+            if refresh:
+                generation = self.cache.generation
+                value = await f(self, *args, **kwargs)
+                value_tags = list(tags(value))
+                # another invalidation that landed while the write ran may be newer than this result
+                unchanged = generation == self.cache.generation
+                self.cache.invalidate(*value_tags)
+                if unchanged:
+                    self.cache.set(key, value, value_tags)
+                return value
+
+            value = self.cache.get(key)
+            if value is not MISSING:
+                return typing.cast(ReturnT, value)
+
+            generation = self.cache.generation
+            value = await f(self, *args, **kwargs)
+            self.cache.set(key, value, tags(value), generation=generation)
+            return value
+
+        return inner
+
+    return decorator
@@ -1,11 +1,18 @@
 import crescent
 import hikari
 
-from modron.db.conn import Conn, DBConn, convert, with_conn
+from modron.db.autocomplete import GuildIndex, indexed
+from modron.db.cache import Tag, cached
+from modron.db.conn import Conn, DBConn, convert, prefix_pattern, single_flight, with_conn
 from modron.models import Character
 
 
+def character_tags(character: Character) -> list[Tag]:
+    return [("character", character.character_id), ("game", character.game_id)]
+
+
 class CharacterDB(DBConn):
+    @single_flight
     @with_conn
     async def count(self, conn: Conn, *, game_id: int) -> int:
         val = await conn.fetchval(
@@ -35,7 +42,7 @@ class CharacterDB(DBConn):
         pronouns: str | None = None,
         image: str | None = None,
     ):
-        return await conn.fetchrow(
+        record = await conn.fetchrow(
             """
             INSERT INTO Characters
             (game_id, author_id, name, pronouns, image, brief, description)
@@ -50,7 +57,11 @@ class CharacterDB(DBConn):
             brief,
             description,
         )
+        self.cache.invalidate(("game", game_id))
+        return record
 
+    @cached("character", "guild_id", "character_id", tags=character_tags)
+    @single_flight
     @with_conn
     @convert(Character)
     async def get(self, conn: Conn, *, character_id: int, guild_id: int):
@@ -76,6 +87,7 @@ class CharacterDB(DBConn):
         )
 
     @with_conn
+    @convert(Character)
     async def update(
         self,
         conn: Conn,
@@ -101,7 +113,7 @@ class CharacterDB(DBConn):
         }
         args = kwargs.values()
         columns = ",\n".join(f"c.{k} = ${i + 3}" for i, k in enumerate(kwargs.keys()))
-        await conn.execute(
+        record = await conn.fetchrow(
             f"""
             UPDATE Characters AS c
             SET
@@ -117,25 +129,35 @@ class CharacterDB(DBConn):
                             p.character_id = $1
                             AND p.user_id = $2
                     )
-                );
+                )
+            RETURNING c.*;
             """,
             character_id,
             user_id,
             *args,
         )
+        self.cache.invalidate(("character", character_id))
+        return record
 
     @with_conn
     async def delete(self, conn: Conn, *, character_id: int) -> None:
-        await conn.execute(
+        game_id = await conn.fetchval(
             """
             DELETE
             FROM Characters
             WHERE
-                character_id = $1;
+                character_id = $1
+            RETURNING game_id;
             """,
             character_id,
         )
+        tags: list[Tag] = [("character", character_id)]
+        if game_id is not None:
+            # the game lists its characters, and any player holding this one has it set to NULL
+            tags.append(("game", game_id))
+        self.cache.invalidate(*tags)
 
+    @indexed(GuildIndex.characters_viewable)
     @with_conn
     async def autocomplete_viewable(
         self, conn: Conn, ctx: crescent.AutocompleteContext, option: hikari.AutocompleteInteractionOption
@@ -146,7 +168,7 @@ class CharacterDB(DBConn):
                 c.character_id, c.name
             FROM Characters AS c
             WHERE
-                c.name ILIKE $1
+                lower(c.name) LIKE $1
                 AND EXISTS (
                     SELECT NULL
                     FROM Players AS p
@@ -157,12 +179,13 @@ class CharacterDB(DBConn):
                 )
             LIMIT 25;
             """,
-            f"{option.value}%",
+            prefix_pattern(option.value),
             ctx.guild_id,
         )
 
         return [hikari.CommandChoice(name=r[1], value=str(r[0])) for r in results]
 
+    @indexed(GuildIndex.characters_editable)
     @with_conn
     async def autocomplete_editable(
         self, conn: Conn, ctx: crescent.AutocompleteContext, option: hikari.AutocompleteInteractionOption
@@ -173,7 +196,7 @@ class CharacterDB(DBConn):
                 c.character_id, c.name
             FROM Characters AS c
             WHERE
-                c.name ILIKE $1
+                lower(c.name) LIKE $1
                 AND EXISTS (
                     SELECT NULL
                     FROM Players AS p
@@ -188,7 +211,7 @@ class CharacterDB(DBConn):
                 )
             LIMIT 25;
             """,
-            f"{option.value}%",
+            prefix_pattern(option.value),
             ctx.guild_id,
             ctx.user.id,
         )
@@ -1,48 +1,210 @@
 from __future__ import annotations
 
+import asyncio
 import functools
+import logging
+import time
 import typing
 
 import asyncpg
 import asyncpg.pool
 
+from modron.config import PoolConfig
+from modron.db.cache import ModelCache
+from modron.db.decode import decode
 from modron.exceptions import NotFoundError
+from modron.metrics import QueryMetrics, count_rows
 
 Record = asyncpg.Record
 
 if typing.TYPE_CHECKING:
+    from modron.db.autocomplete import AutocompleteIndex
+
     Conn = asyncpg.pool.PoolConnectionProxy[Record]
     Pool = asyncpg.Pool[Record]
 else:
     Conn = asyncpg.pool.PoolConnectionProxy
     Pool = asyncpg.Pool
 
+logger = logging.getLogger(__name__)
 
-class DBConn:
-    def __init__(self, pool: Pool) -> None:
-        self.pool = pool
+SpecT = typing.ParamSpec("SpecT")
+ReturnT = typing.TypeVar("ReturnT")
 
+# postgres enums that asyncpg decodes into python values itself, registered on every connection.
+# type name -> (encoder, decoder), to and from the enum's label
+enum_codecs: dict[str, tuple[typing.Callable[[typing.Any], str], typing.Callable[[str], typing.Any]]] = {}
 
-async def connect(url: str) -> Pool:
-    pool = await asyncpg.create_pool(url, record_class=Record)
+
+def enum_codec(
+    name: str, *, encoder: typing.Callable[[typing.Any], str] = str
+) -> typing.Callable[[typing.Callable[[str], ReturnT]], typing.Callable[[str], ReturnT]]:
+    """
+    Register a decoder for the postgres enum `name`, whose values then arrive decoded in every record,
+    including in rows nested in other rows.
+    """
+
+    def decorator(decoder: typing.Callable[[str], ReturnT]) -> typing.Callable[[str], ReturnT]:
+        enum_codecs[name] = (encoder, decoder)
+        return decoder
+
+    return decorator
+
+
+async def init_connection(conn: asyncpg.Connection[Record]) -> None:
+    """
+    Set up a new connection of the pool. `server_settings`, such as jit, are already applied by then.
+    """
+    # migrations create types in the first schema of the search path, which isn't always public
+    schema = await conn.fetchval("SELECT current_schema();")
+    for name, (encoder, decoder) in enum_codecs.items():
+        try:
+            # an enum's binary format is its label, and composite rows can only hold binary codecs
+            await conn.set_type_codec(
+                name,
+                schema=schema,
+                encoder=lambda value, encoder=encoder: encoder(value).encode(),
+                decoder=lambda label, decoder=decoder: decoder(label.decode()),
+                format="binary",
+            )
+        except ValueError:
+            # types don't exist until they are migrated, e.g. while running `migrate` on a new database
+            logger.debug("type %s doesn't exist, so it isn't decoded", name)
+
+
+class DBConn:
+    def __init__(
+        self,
+        pool: Pool,
+        cache: ModelCache,
+        index: AutocompleteIndex | None = None,
+        *,
+        metrics: QueryMetrics | None = None,
+    ) -> None:
+        self.pool = pool
+        self.cache = cache
+        self.index = index
+        self.metrics = metrics if metrics is not None else QueryMetrics()
+        # (method, args, kwargs) -> (cache generation, call), for `single_flight`
+        self.flights: dict[typing.Hashable, tuple[int, asyncio.Future[typing.Any]]] = {}
+
+
+async def connect(url: str, config: PoolConfig | None = None) -> Pool:
+    if config is None:
+        config = PoolConfig()
+
+    pool = await asyncpg.create_pool(
+        url,
+        record_class=Record,
+        min_size=config.min_size,
+        max_size=config.max_size,
+        max_inactive_connection_lifetime=config.max_inactive_connection_lifetime,
+        statement_cache_size=config.statement_cache_size,
+        command_timeout=config.command_timeout,
+        server_settings=config.server_settings,
+        init=init_connection,
+    )
     if pool is None:
         raise RuntimeError("Could not create asyncpg connection pool")
 
+    max_connections = int(await pool.fetchval("SHOW max_connections;"))
+    logger.info(
+        "database pool: %d-%d connections (server allows %d), idle lifetime %ss, statement cache %d, "
+        "command timeout %ss, settings %s, decoding types %s",
+        config.min_size,
+        config.max_size,
+        max_connections,
+        config.max_inactive_connection_lifetime,
+        config.statement_cache_size,
+        config.command_timeout,
+        config.server_settings,
+        ", ".join(enum_codecs) or "none",
+    )
+    if config.max_size >= max_connections:
+        logger.warning(
+            "pool.max_size (%d) leaves no room below the server's max_connections (%d)",
+            config.max_size,
+            max_connections,
+        )
+
     return pool
 
 
-SpecT = typing.ParamSpec("SpecT")
-ReturnT = typing.TypeVar("ReturnT")
+def prefix_pattern(value: typing.Any) -> str:
+    """
+    Build a `LIKE` pattern matching strings that start with `value`, ignoring case.
+    Intended for `lower(column) LIKE $n`, which the `lower(...) text_pattern_ops` indexes in the schema can serve.
+    """
+    escaped = str(value).lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
+
+
 SelfT = typing.TypeVar("SelfT", bound="DBConn")
 
 
 def with_conn(
     f: typing.Callable[typing.Concatenate[SelfT, Conn, SpecT], typing.Coroutine[typing.Any, typing.Any, ReturnT]]
 ) -> typing.Callable[typing.Concatenate[SelfT, SpecT], typing.Coroutine[typing.Any, typing.Any, ReturnT]]:
+    """
+    Acquire a connection from the pool for the duration of the method, and record its timings in `self.metrics`.
+    """
+    method = f.__qualname__
+
     @functools.wraps(f)
     async def inner(self: SelfT, *args: SpecT.args, **kwargs: SpecT.kwargs) -> ReturnT:
+        start = time.perf_counter()
         async with self.pool.acquire() as conn:
-            return await f(self, conn, *args, **kwargs)
+            acquired = time.perf_counter()
+            rows: int | None = None
+            try:
+                result = await f(self, conn, *args, **kwargs)
+                rows = count_rows(result)
+                return result
+            except NotFoundError:
+                rows = 0
+                raise
+            finally:
+                self.metrics.observe(
+                    method, args, kwargs, wait=acquired - start, duration=time.perf_counter() - acquired, rows=rows
+                )
+
+    return inner
+
+
+def single_flight(
+    f: typing.Callable[typing.Concatenate[SelfT, SpecT], typing.Coroutine[typing.Any, typing.Any, ReturnT]]
+) -> typing.Callable[typing.Concatenate[SelfT, SpecT], typing.Coroutine[typing.Any, typing.Any, ReturnT]]:
+    """
+    Share one call of a read among concurrent callers with the same arguments, so a burst uses one connection.
+    A call is only shared while the cache generation is unchanged, so no caller gets a result older than its writes.
+    This should be applied outside of `with_conn`, and inside of `cached`.
+    """
+    method = f.__qualname__
+
+    @functools.wraps(f)
+    async def inner(self: SelfT, *args: SpecT.args, **kwargs: SpecT.kwargs) -> ReturnT:
+        key = (method, args, tuple(sorted(kwargs.items())))
+        generation = self.cache.generation
+
+        flight = self.flights.get(key)
+        if flight is not None and flight[0] == generation:
+            self.metrics.coalesced[method] += 1
+            return await asyncio.shield(flight[1])
+
+        call = asyncio.ensure_future(f(self, *args, **kwargs))
+        self.flights[key] = (generation, call)
+
+        def done(_: asyncio.Future[ReturnT]) -> None:
+            if self.flights.get(key, (0, None))[1] is call:
+                del self.flights[key]
+            # every caller may have been cancelled, in which case nobody retrieves the exception
+            if not call.cancelled():
+                call.exception()
+
+        call.add_done_callback(done)
+
+        # other callers may be waiting on this call, so this one being cancelled shouldn't cancel it
+        return await asyncio.shield(call)
 
     return inner
 
@@ -56,12 +218,12 @@ def convert(
     def decorator(
         f: typing.Callable[SpecT, typing.Coroutine[typing.Any, typing.Any, Record | None]]
     ) -> typing.Callable[SpecT, typing.Coroutine[typing.Any, typing.Any, ReturnT]]:
+        @functools.wraps(f)
         async def inner(*args: SpecT.args, **kwargs: SpecT.kwargs) -> ReturnT:
             record = await f(*args, **kwargs)
             if record is None:
                 raise NotFoundError(t.__name__)
-            val = typing.cast(typing.Mapping[str, typing.Any], record)
-            return t(**val)
+            return decode(t, record)
 
         return inner
 
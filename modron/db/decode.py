@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import typing
+
+import attrs
+
+if typing.TYPE_CHECKING:
+    from modron.db.conn import Record
+
+ModelT = typing.TypeVar("ModelT")
+
+# (model, columns, shared) -> decoder, compiled on first use
+_decoders: dict[tuple[type[typing.Any], tuple[str, ...], tuple[str, ...]], typing.Callable[..., typing.Any]] = {}
+
+
+def decoded(
+    decode: typing.Callable[..., typing.Any], *, nullable: bool = False, row: bool = False, **kwargs: typing.Any
+) -> typing.Any:
+    """
+    An attrs field whose column is passed through `decode` when the model is loaded from a record.
+    With `nullable`, NULL is kept as None rather than decoded.
+    With `row`, `decode` is also passed the whole record, for values built from the rest of the row.
+    Unlike an attrs converter, this doesn't run when the model is constructed any other way.
+    """
+    return attrs.field(metadata={"decode": decode, "nullable": nullable, "row": row}, **kwargs)
+
+
+def _compile(
+    model: type[typing.Any], columns: tuple[str, ...], shared: tuple[str, ...]
+) -> typing.Callable[..., typing.Any]:
+    # models are frozen, and a frozen attrs __init__ sets each field through object.__setattr__.
+    # setting the slots directly skips that, and makes decoding about as cheap as for a mutable class.
+    namespace: dict[str, typing.Any] = {"new": object.__new__, "model": model}
+    lines = ["self = new(model)"]
+    # fields with a default that depends on other fields are set last
+    defaults: list[str] = []
+
+    positions = {column: i for i, column in enumerate(columns)}
+    for field in attrs.fields(model):
+        name = field.name
+        namespace[f"set_{name}"] = getattr(model, name).__set__
+
+        if name in shared:
+            lines.append(f"set_{name}(self, {name})")
+            continue
+
+        i = positions.get(name)
+        if i is None:
+            if field.default is attrs.NOTHING:
+                raise TypeError(f"{model.__name__} can't be decoded without a {name} column")
+            namespace[f"default_{name}"] = field.default
+            if not isinstance(field.default, attrs.Factory):
+                lines.append(f"set_{name}(self, default_{name})")
+            elif field.default.takes_self:
+                defaults.append(f"set_{name}(self, default_{name}.factory(self))")
+            else:
+                lines.append(f"set_{name}(self, default_{name}.factory())")
+            continue
+
+        decode = field.metadata.get("decode")
+        if decode is None:
+            lines.append(f"set_{name}(self, r[{i}])")
+            continue
+
+        namespace[f"decode_{name}"] = decode
+        value = f"decode_{name}(r[{i}], r)" if field.metadata["row"] else f"decode_{name}(r[{i}])"
+        if field.metadata["nullable"]:
+            value = f"None if r[{i}] is None else {value}"
+        lines.append(f"set_{name}(self, {value})")
+
+    # columns are read by position, which is much cheaper than unpacking a record as a mapping.
+    # columns that aren't fields are skipped, a row of a subclass has more columns than its base model.
+    body = "".join(f"    {line}\n" for line in (*lines, *defaults, "return self"))
+    source = f"def decode({', '.join(('r', *shared))}):\n{body}"
+    exec(compile(source, f"<decode {model.__name__}>", "exec"), namespace)
+    return namespace["decode"]
+
+
+def decoder(
+    model: type[ModelT], columns: tuple[str, ...], shared: tuple[str, ...] = ()
+) -> typing.Callable[..., ModelT]:
+    """
+    A function building `model`, a slotted attrs class, from records with these columns, in this order.
+    Fields named in `shared` aren't read from the record, and are passed to the decoder after it instead.
+    """
+    key = (model, columns, shared)
+    decode = _decoders.get(key)
+    if decode is None:
+        decode = _decoders[key] = _compile(model, columns, shared)
+    return decode
+
+
+def decode(model: type[ModelT], record: Record) -> ModelT:
+    return decoder(model, tuple(record.keys()))(record)
+
+
+def decode_all(model: type[ModelT], records: typing.Sequence[Record], **shared: typing.Any) -> tuple[ModelT, ...]:
+    """
+    Decode a list of records of the same row type, such as an aggregated array of rows.
+    `shared` fields are given the same value, by reference, in every model.
+    """
+    if not records:
+        return ()
+    decode = decoder(model, tuple(records[0].keys()), tuple(shared))
+    values = shared.values()
+    return tuple([decode(r, *values) for r in records])
+
+
+def decode_first(model: type[ModelT], records: typing.Sequence[Record]) -> ModelT | None:
+    if not records:
+        return None
+    return decode(model, records[0])
@@ -2,9 +2,41 @@ import crescent
 import hikari
 import toolbox
 
-from modron.db.conn import Conn, DBConn, convert, with_conn
+from modron.db.autocomplete import GuildIndex, indexed
+from modron.db.cache import Tag, cached
+from modron.db.conn import Conn, DBConn, convert, prefix_pattern, single_flight, with_conn
 from modron.models import Game, GameLite
 
+# the relations of a `Game`, selected alongside the columns of a game aliased `g`.
+# each relation is aggregated in its own subquery.
+# joining them all at once would multiply characters by players before aggregating.
+GAME_RELATIONS = """
+    ARRAY(
+        SELECT s
+        FROM Systems AS s
+        WHERE s.system_id = g.system_id
+    ) AS system,
+    ARRAY(
+        SELECT c
+        FROM Characters AS c
+        WHERE c.game_id = g.game_id
+    ) AS characters,
+    ARRAY(
+        SELECT p
+        FROM Players AS p
+        WHERE p.game_id = g.game_id
+    ) AS players
+"""
+
+
+def game_tags(game: GameLite) -> list[Tag]:
+    tags: list[Tag] = [("game", game.game_id)]
+    if game.system_id is not None:
+        tags.append(("system", game.system_id))
+    if isinstance(game, Game):
+        tags += [("character", c.character_id) for c in game.characters]
+    return tags
+
 
 class GameDB(DBConn):
     @with_conn
@@ -22,7 +54,7 @@ class GameDB(DBConn):
         image: str | None = None,
     ):
         abbreviation = abbreviation or name[:25]
-        return await conn.fetchrow(
+        record = await conn.fetchrow(
             """
             INSERT INTO Games (name, abbreviation, description, system_id, guild_id, author_id, image)
             VALUES ($1, $2, $3, $4, $5, $6, $7)
@@ -36,7 +68,12 @@ class GameDB(DBConn):
             author_id,
             image,
         )
+        # cached systems list their games
+        self.cache.invalidate(("system", system_id), ("guild", guild_id))
+        return record
 
+    @cached("game_lite", "guild_id", "game_id", tags=game_tags)
+    @single_flight
     @with_conn
     @convert(GameLite)
     async def get_lite(self, conn: Conn, *, game_id: int, guild_id: int):
@@ -56,24 +93,20 @@ class GameDB(DBConn):
             guild_id,
         )
 
+    @cached("game", "guild_id", "game_id", tags=game_tags)
+    @single_flight
     @with_conn
     @convert(Game)
     async def get(self, conn: Conn, *, game_id: int, guild_id: int):
         return await conn.fetchrow(
-            """
+            f"""
             SELECT
                 g.*,
-                array_remove(array_agg(s), NULL) AS system,
-                array_remove(array_agg(c), NULL) AS characters,
-                array_remove(array_agg(p), NULL) AS players
+                {GAME_RELATIONS}
             FROM Games AS g
-            LEFT JOIN Systems AS s USING (system_id)
-            LEFT JOIN Characters AS c USING (game_id)
-            LEFT JOIN Players AS p USING (game_id)
             WHERE
-                game_id = $1
-                AND g.guild_id = $2
-            GROUP BY game_id;
+                g.game_id = $1
+                AND g.guild_id = $2;
             """,
             game_id,
             guild_id,
@@ -113,14 +146,16 @@ class GameDB(DBConn):
             author_id,
         )
 
+    @cached("game", "guild_id", "game_id", tags=game_tags, refresh=True)
     @with_conn
+    @convert(Game)
     async def update(
         self,
         conn: Conn,
         *,
         game_id: int,
         guild_id: int,
-        author_id: int,
+        author_id: int | None = None,
         name: hikari.UndefinedNoneOr[str] = hikari.UNDEFINED,
         abbreviation: hikari.UndefinedNoneOr[str] = hikari.UNDEFINED,
         description: hikari.UndefinedNoneOr[str] = hikari.UNDEFINED,
@@ -154,15 +189,24 @@ class GameDB(DBConn):
         }
         args = kwargs.values()
         columns = ",\n".join(f"{k} = ${i + 4}" for i, k in enumerate(kwargs.keys()))
-        await conn.execute(
+        # the updated row is returned with the same relations as `get`, saving callers a second query.
+        # without an `author_id` the game is updated whoever its author is
+        return await conn.fetchrow(
             f"""
-            UPDATE Games
-            SET
-                {columns}
-            WHERE
-                game_id = $1
-                AND guild_id = $2
-                AND author_id = $3;
+            WITH g AS (
+                UPDATE Games
+                SET
+                    {columns}
+                WHERE
+                    game_id = $1
+                    AND guild_id = $2
+                    AND author_id = COALESCE($3, author_id)
+                RETURNING *
+            )
+            SELECT
+                g.*,
+                {GAME_RELATIONS}
+            FROM g;
             """,
             game_id,
             guild_id,
@@ -172,16 +216,23 @@ class GameDB(DBConn):
 
     @with_conn
     async def delete(self, conn: Conn, *, game_id: int) -> None:
-        await conn.execute(
+        system_id = await conn.fetchval(
             """
             DELETE
             FROM Games
             WHERE
-                game_id = $1;
+                game_id = $1
+            RETURNING system_id;
             """,
             game_id,
         )
+        tags: list[Tag] = [("game", game_id)]
+        if system_id is not None:
+            # the system's later pages of games shift
+            tags.append(("system", system_id))
+        self.cache.invalidate(*tags)
 
+    @indexed(GuildIndex.games_guild)
     @with_conn
     async def autocomplete_guild(
         self, conn: Conn, ctx: crescent.AutocompleteContext, option: hikari.AutocompleteInteractionOption
@@ -194,17 +245,18 @@ class GameDB(DBConn):
             WHERE
                 guild_id = $1
                 AND (
-                    name ILIKE $2
-                    OR abbreviation ILIKE $2
+                    lower(name) LIKE $2
+                    OR lower(abbreviation) LIKE $2
                 )
             LIMIT 25;
             """,
             ctx.guild_id,
-            f"{option.value}%",
+            prefix_pattern(option.value),
         )
 
         return [(r[1], str(r[0])) for r in results]
 
+    @indexed(GuildIndex.games_editable)
     @with_conn
     async def autocomplete_editable(
         self, conn: Conn, ctx: crescent.AutocompleteContext, option: hikari.AutocompleteInteractionOption
@@ -220,13 +272,13 @@ class GameDB(DBConn):
                 WHERE
                     guild_id = $1
                     AND (
-                        name ILIKE $2
-                        OR abbreviation ILIKE $2
+                        lower(name) LIKE $2
+                        OR lower(abbreviation) LIKE $2
                     )
                 LIMIT 25;
                 """,
                 ctx.guild_id,
-                f"{option.value}%",
+                prefix_pattern(option.value),
             )
         else:
             results = await conn.fetch(
@@ -238,18 +290,19 @@ class GameDB(DBConn):
                     guild_id = $1
                     AND author_id = $3
                     AND (
-                        name ILIKE $2
-                        OR abbreviation ILIKE $2
+                        lower(name) LIKE $2
+                        OR lower(abbreviation) LIKE $2
                     )
                 LIMIT 25;
                 """,
                 ctx.guild_id,
-                f"{option.value}%",
+                prefix_pattern(option.value),
                 ctx.user.id,
             )
 
         return [(r[1], str(r[0])) for r in results]
 
+    @indexed(GuildIndex.games_joinable)
     @with_conn
     async def autocomplete_joinable(
         self, conn: Conn, ctx: crescent.AutocompleteContext, option: hikari.AutocompleteInteractionOption
@@ -264,8 +317,8 @@ class GameDB(DBConn):
                 AND g.author_id != $2
                 AND g.seeking_players IS TRUE
                 AND (
-                    g.name ILIKE $3
-                    OR g.abbreviation ILIKE $3
+                    lower(g.name) LIKE $3
+                    OR lower(g.abbreviation) LIKE $3
                 )
                 AND NOT EXISTS (
                     SELECT NULL
@@ -278,11 +331,12 @@ class GameDB(DBConn):
             """,
             ctx.guild_id,
             ctx.user.id,
-            f"{option.value}%",
+            prefix_pattern(option.value),
         )
 
         return [(r[1], str(r[0])) for r in results]
 
+    @indexed(GuildIndex.games_joined)
     @with_conn
     async def autocomplete_joined(
         self, conn: Conn, ctx: crescent.AutocompleteContext, option: hikari.AutocompleteInteractionOption
@@ -302,18 +356,19 @@ class GameDB(DBConn):
                         AND p.user_id = $2
                 )
                 AND (
-                    g.name ILIKE $3
-                    OR g.abbreviation ILIKE $3
+                    lower(g.name) LIKE $3
+                    OR lower(g.abbreviation) LIKE $3
                 )
             LIMIT 25;
             """,
             ctx.guild_id,
             ctx.user.id,
-            f"{option.value}%",
+            prefix_pattern(option.value),
         )
 
         return [(r[1], str(r[0])) for r in results]
 
+    @indexed(GuildIndex.games_involved)
     @with_conn
     async def autocomplete_involved(
         self, conn: Conn, ctx: crescent.AutocompleteContext, option: hikari.AutocompleteInteractionOption
@@ -336,14 +391,14 @@ class GameDB(DBConn):
                     )
                 )
                 AND (
-                    g.name ILIKE $3
-                    OR g.abbreviation ILIKE $3
+                    lower(g.name) LIKE $3
+                    OR lower(g.abbreviation) LIKE $3
                 )
             LIMIT 25;
             """,
             ctx.guild_id,
             ctx.user.id,
-            f"{option.value}%",
+            prefix_pattern(option.value),
         )
 
         return [(r[1], str(r[0])) for r in results]
@@ -0,0 +1,98 @@
+import functools
+import logging
+import typing
+
+import asyncpg
+
+from modron.db.cache import Tag, cached
+from modron.db.conn import Conn, DBConn, convert, single_flight, with_conn
+from modron.models import FeedbackMenu
+
+logger = logging.getLogger(__name__)
+# whether the missing table was logged, which is only worth doing once
+_unmigrated_logged = False
+
+SpecT = typing.ParamSpec("SpecT")
+ReturnT = typing.TypeVar("ReturnT")
+
+
+def menu_tags(menu: FeedbackMenu) -> list[Tag]:
+    return [("menu", menu.channel_id)]
+
+
+def unless_unmigrated(
+    f: typing.Callable[SpecT, typing.Coroutine[typing.Any, typing.Any, ReturnT]]
+) -> typing.Callable[SpecT, typing.Coroutine[typing.Any, typing.Any, ReturnT | None]]:
+    """
+    Return None instead of raising while the FeedbackMenus table doesn't exist, before migration 0005 is applied.
+    Until then no menu is recorded, and every channel is searched instead.
+    """
+
+    @functools.wraps(f)
+    async def inner(*args: SpecT.args, **kwargs: SpecT.kwargs) -> ReturnT | None:
+        try:
+            return await f(*args, **kwargs)
+        except asyncpg.UndefinedTableError:
+            global _unmigrated_logged
+            if not _unmigrated_logged:
+                _unmigrated_logged = True
+                logger.warning(
+                    "feedback menus aren't recorded until migrations are applied, with `python -m modron migrate`"
+                )
+            return None
+
+    return inner
+
+
+class MenuDB(DBConn):
+    """
+    The message holding the feedback or anonymous message menu in each channel.
+    Channels whose menu was sent before this was recorded aren't found, and have to be searched instead.
+    """
+
+    @cached("menu", "channel_id", tags=menu_tags)
+    @single_flight
+    @with_conn
+    @convert(FeedbackMenu)
+    # inside `convert`, so that a missing table is a missing record
+    @unless_unmigrated
+    async def get(self, conn: Conn, *, channel_id: int):
+        return await conn.fetchrow(
+            """
+            SELECT *
+            FROM FeedbackMenus
+            WHERE channel_id = $1;
+            """,
+            channel_id,
+        )
+
+    @unless_unmigrated
+    @cached("menu", "channel_id", tags=menu_tags, refresh=True)
+    @with_conn
+    @convert(FeedbackMenu)
+    async def set(self, conn: Conn, *, channel_id: int, message_id: int):
+        return await conn.fetchrow(
+            """
+            INSERT INTO FeedbackMenus
+            (channel_id, message_id)
+            VALUES ($1, $2)
+            ON CONFLICT (channel_id)
+                DO UPDATE SET message_id = EXCLUDED.message_id
+            RETURNING *;
+            """,
+            channel_id,
+            message_id,
+        )
+
+    @unless_unmigrated
+    @with_conn
+    async def delete(self, conn: Conn, *, channel_id: int) -> None:
+        await conn.execute(
+            """
+            DELETE
+            FROM FeedbackMenus
+            WHERE channel_id = $1;
+            """,
+            channel_id,
+        )
+        self.cache.invalidate(("menu", channel_id))
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import typing
+from pathlib import Path
+
+from modron.db.conn import Conn, Pool
+
+MIGRATIONS_PATH = Path(__file__).parent / "migrations"
+
+# migrations starting with this line run outside of a transaction, one statement at a time.
+# this is required for `CREATE INDEX CONCURRENTLY`, which postgres refuses to run inside a transaction.
+NO_TRANSACTION = "-- modron:no-transaction"
+
+# held while migrating, so that two processes starting at once don't apply the same migration twice
+LOCK_ID = 0x6D6F64726F6E
+LOCK_POLL_INTERVAL = 0.5
+
+FILE_NAME = re.compile(r"^(\d{4})_(\w+)\.sql$")
+CONCURRENT_INDEX = re.compile(r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)", re.IGNORECASE)
+
+
+class Migration(typing.NamedTuple):
+    version: int
+    name: str
+    sql: str
+
+    @property
+    def transactional(self) -> bool:
+        return not self.sql.startswith(NO_TRANSACTION)
+
+    @property
+    def statements(self) -> list[str]:
+        """
+        The individual statements of the migration, for running outside of a transaction.
+        Statements are split on `;`, so these migrations can't use semicolons anywhere else.
+        """
+        lines = (line for line in self.sql.splitlines() if not line.lstrip().startswith("--"))
+        return [s.strip() for s in "\n".join(lines).split(";") if s.strip()]
+
+    @property
+    def concurrent_indexes(self) -> list[str]:
+        return CONCURRENT_INDEX.findall(self.sql)
+
+
+def load(path: Path = MIGRATIONS_PATH) -> list[Migration]:
+    """
+    Read the migrations in `path`, ordered by version. Files are named like `0001_initial.sql`.
+    """
+    migrations: list[Migration] = []
+    for file in path.iterdir():
+        match = FILE_NAME.match(file.name)
+        if match is None:
+            continue
+        migrations.append(Migration(int(match[1]), match[2], file.read_text()))
+
+    migrations.sort()
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"Duplicate migration versions in {path}")
+
+    return migrations
+
+
+async def applied(conn: Conn) -> set[int]:
+    await conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        """
+    )
+    return {r["version"] for r in await conn.fetch("SELECT version FROM schema_version;")}
+
+
+async def run(conn: Conn, migration: Migration) -> None:
+    """
+    Apply a single migration and record it in `schema_version`.
+    """
+    record = "INSERT INTO schema_version (version, name) VALUES ($1, $2);"
+
+    if migration.transactional:
+        async with conn.transaction():
+            await conn.execute(migration.sql)
+            await conn.execute(record, migration.version, migration.name)
+        return
+
+    # a concurrent index build that failed part way leaves an invalid index behind,
+    # which `IF NOT EXISTS` would then skip. Drop those so that retrying builds them again.
+    for name in await conn.fetch(
+        """
+        SELECT c.relname
+        FROM pg_index AS i
+        INNER JOIN pg_class AS c ON c.oid = i.indexrelid
+        WHERE NOT i.indisvalid AND c.relname = ANY($1::text[]);
+        """,
+        migration.concurrent_indexes,
+    ):
+        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name['relname']};")
+
+    for statement in migration.statements:
+        await conn.execute(statement)
+    await conn.execute(record, migration.version, migration.name)
+
+
+async def apply(pool: Pool, migrations: list[Migration] | None = None) -> list[Migration]:
+    """
+    Apply every migration that hasn't been applied yet, in order. Returns the migrations that were applied.
+    """
+    if migrations is None:
+        migrations = load()
+
+    async with pool.acquire() as conn:
+        # waiting in `pg_advisory_lock` would hold a transaction open,
+        # and `CREATE INDEX CONCURRENTLY` in the other process waits for every open transaction to finish.
+        while not await conn.fetchval("SELECT pg_try_advisory_lock($1);", LOCK_ID):
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+
+        try:
+            done = await applied(conn)
+            pending = [m for m in migrations if m.version not in done]
+            for migration in pending:
+                await run(conn, migration)
+            return pending
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1);", LOCK_ID)
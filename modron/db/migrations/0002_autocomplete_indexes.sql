@@ -0,0 +1,12 @@
+-- modron:no-transaction
+
+-- autocomplete matches `lower(name) LIKE 'prefix%'` and the same for abbreviations, scoped to a guild.
+-- text_pattern_ops lets these btree indexes serve prefix matches regardless of the database collation.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS systems_guild_name_prefix_idx ON Systems (guild_id, lower(name) text_pattern_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS systems_guild_abbreviation_prefix_idx ON Systems (guild_id, lower(abbreviation) text_pattern_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS games_guild_name_prefix_idx ON Games (guild_id, lower(name) text_pattern_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS games_guild_abbreviation_prefix_idx ON Games (guild_id, lower(abbreviation) text_pattern_ops);
+
+-- characters don't store a guild, it is checked through their players
+CREATE INDEX CONCURRENTLY IF NOT EXISTS characters_name_prefix_idx ON Characters (lower(name) text_pattern_ops);
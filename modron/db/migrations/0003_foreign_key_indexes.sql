@@ -0,0 +1,12 @@
+-- modron:no-transaction
+
+-- foreign keys and membership lookups.
+-- Postgres doesn't index the referencing side of a foreign key, and players_pk leads with user_id.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS games_system_id_idx ON Games (system_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS games_guild_author_idx ON Games (guild_id, author_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS games_guild_seeking_idx ON Games (guild_id, seeking_players);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS characters_game_id_idx ON Characters (game_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS players_game_id_idx ON Players (game_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS players_character_id_idx ON Players (character_id) WHERE character_id IS NOT NULL;
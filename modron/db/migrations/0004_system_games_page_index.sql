@@ -0,0 +1,6 @@
+-- modron:no-transaction
+
+-- systems list their games a page at a time, ordered by game_id.
+-- this reads a page straight off the index, and still serves the foreign key, so it replaces games_system_id_idx.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS games_system_page_idx ON Games (system_id, game_id);
+DROP INDEX CONCURRENTLY IF EXISTS games_system_id_idx;
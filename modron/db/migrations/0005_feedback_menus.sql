@@ -0,0 +1,8 @@
+-- the message holding each channel's feedback or anonymous message menu,
+-- so that moving a menu deletes it by id instead of searching the channel's history for it.
+CREATE TABLE IF NOT EXISTS FeedbackMenus (
+    channel_id BIGINT NOT NULL,
+    message_id BIGINT NOT NULL,
+
+    CONSTRAINT feedback_menus_pk PRIMARY KEY (channel_id)
+);
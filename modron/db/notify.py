@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import typing
+
+import asyncpg
+
+from modron.config import PoolConfig
+from modron.db.cache import ModelCache, Tag
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "modron_invalidate"
+# postgres rejects notification payloads of 8000 bytes or more
+MAX_PAYLOAD = 7900
+RECONNECT_DELAY = 5.0
+
+_dumps = json.JSONEncoder(separators=(",", ":")).encode
+
+
+def _payloads(tags: list[Tag] | None) -> typing.Iterator[str]:
+    if tags is None:
+        yield _dumps(None)
+        return
+
+    batch: list[Tag] = []
+    size = 2
+    for tag in tags:
+        encoded = len(_dumps(tag)) + 1
+        if batch and size + encoded > MAX_PAYLOAD:
+            yield _dumps(batch)
+            batch, size = [], 2
+        batch.append(tag)
+        size += encoded
+    if batch:
+        yield _dumps(batch)
+
+
+class CacheNotifier:
+    """
+    Shares cache invalidations between processes using the same database, with postgres LISTEN/NOTIFY.
+
+    Every local invalidation is sent as a notification, and every notification from another process
+    invalidates the same tags locally. Invalidations are batched per event loop iteration, and sent over
+    a dedicated connection that also listens, so that a process can recognize and skip its own notifications.
+
+    Notifications sent while the connection is down are lost, so the local cache is cleared on reconnect.
+    """
+
+    def __init__(self, url: str, config: PoolConfig, cache: ModelCache) -> None:
+        self.url = url
+        self.config = config
+        self.cache = cache
+
+        self.conn: asyncpg.Connection[asyncpg.Record] | None = None
+        self.outgoing: set[Tag] = set()
+        self.clear_outgoing = False
+        self.flushing: asyncio.Task[None] | None = None
+        self.reconnecting: asyncio.Task[None] | None = None
+        self.closed = False
+        # set while applying a notification, so that it isn't sent back out
+        self.receiving = False
+
+        self.sent = 0
+        self.received = 0
+
+        cache.subscribe(self.publish)
+
+    async def start(self) -> None:
+        self.conn = await asyncpg.connect(self.url, server_settings=self.config.server_settings)
+        self.conn.add_termination_listener(self._terminated)
+        await self.conn.add_listener(CHANNEL, self._receive)
+
+    async def close(self) -> None:
+        self.closed = True
+        if self.reconnecting is not None:
+            self.reconnecting.cancel()
+        if self.flushing is not None:
+            await self.flushing
+        if self.conn is not None:
+            await self.conn.close()
+
+    def publish(self, tags: tuple[Tag, ...] | None) -> None:
+        if self.receiving or self.closed:
+            return
+
+        if tags is None:
+            self.clear_outgoing = True
+        else:
+            self.outgoing.update(tags)
+
+        if self.flushing is None:
+            self.flushing = asyncio.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        try:
+            # invalidations made in the same loop iteration go out together
+            await asyncio.sleep(0)
+
+            while self.outgoing or self.clear_outgoing:
+                tags = None if self.clear_outgoing else sorted(self.outgoing)
+                self.outgoing.clear()
+                self.clear_outgoing = False
+
+                if self.conn is None or self.conn.is_closed():
+                    # the cache is cleared on reconnect, so there is no need to queue these
+                    continue
+
+                for payload in _payloads(tags):
+                    await self.conn.execute("SELECT pg_notify($1, $2);", CHANNEL, payload)
+                    self.sent += 1
+        except (asyncpg.PostgresError, asyncpg.InterfaceError, OSError):
+            logger.exception("failed to send cache invalidations")
+        finally:
+            self.flushing = None
+
+    def _receive(self, conn: typing.Any, pid: int, channel: str, payload: str) -> None:
+        if pid == conn.get_server_pid():
+            return
+
+        self.received += 1
+        tags: list[list[typing.Any]] | None = json.loads(payload)
+
+        self.receiving = True
+        try:
+            if tags is None:
+                self.cache.clear()
+            else:
+                self.cache.invalidate(*((str(kind), int(id)) for kind, id in tags))
+        finally:
+            self.receiving = False
+
+    def _terminated(self, conn: typing.Any) -> None:
+        if not self.closed and self.reconnecting is None:
+            logger.warning("lost the cache invalidation connection, reconnecting")
+            self.reconnecting = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        try:
+            while not self.closed:
+                try:
+                    await self.start()
+                    break
+                except (OSError, asyncpg.PostgresError):
+                    logger.exception("failed to reconnect for cache invalidations")
+                    await asyncio.sleep(RECONNECT_DELAY)
+
+            # anything invalidated while disconnected was missed
+            self.receiving = True
+            try:
+                self.cache.clear()
+            finally:
+                self.receiving = False
+        finally:
+            self.reconnecting = None
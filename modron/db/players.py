@@ -1,10 +1,16 @@
 import hikari
 
-from modron.db.conn import Conn, DBConn, convert, with_conn
+from modron.db.cache import Tag, cached
+from modron.db.conn import Conn, DBConn, convert, single_flight, with_conn
 from modron.models import Player
 
 
+def player_tags(player: Player) -> list[Tag]:
+    return [("game", player.game_id)]
+
+
 class PlayerDB(DBConn):
+    @single_flight
     @with_conn
     async def count(self, conn: Conn, *, game_id: int) -> int:
         val = await conn.fetchval(
@@ -33,7 +39,10 @@ class PlayerDB(DBConn):
             user_id,
             game_id,
         )
+        self.cache.invalidate(("game", game_id))
 
+    @cached("player", "game_id", "user_id", tags=player_tags)
+    @single_flight
     @with_conn
     @convert(Player)
     async def get(self, conn: Conn, *, game_id: int, user_id: int):
@@ -49,7 +58,9 @@ class PlayerDB(DBConn):
             user_id,
         )
 
+    @cached("player", "game_id", "user_id", tags=player_tags, refresh=True)
     @with_conn
+    @convert(Player)
     async def update(
         self,
         conn: Conn,
@@ -57,17 +68,18 @@ class PlayerDB(DBConn):
         game_id: int,
         user_id: int,
         character_id: hikari.UndefinedNoneOr[int] = hikari.UNDEFINED,
-    ) -> None:
+    ):
         if character_id is hikari.UNDEFINED:
-            return
-        await conn.execute(
+            character_id = None
+        return await conn.fetchrow(
             """
             UPDATE Players
             SET
                 character_id = COALESCE($3, character_id)
             WHERE
                 game_id = $1
-                AND user_id = $2;
+                AND user_id = $2
+            RETURNING *;
             """,
             game_id,
             user_id,
@@ -87,6 +99,7 @@ class PlayerDB(DBConn):
             game_id,
             user_id,
         )
+        self.cache.invalidate(("game", game_id))
 
     @with_conn
     async def exists(self, conn: Conn, *, game_id: int, user_id: int) -> bool:
@@ -1,9 +1,20 @@
 import crescent
 import hikari
 
-from modron.db.conn import Conn, DBConn, convert, with_conn
+from modron.db.autocomplete import GuildIndex, indexed
+from modron.db.cache import Tag, cached
+from modron.db.conn import Conn, DBConn, convert, prefix_pattern, single_flight, with_conn
 from modron.models import System, SystemLite
 
+GAMES_PER_PAGE = 10
+
+
+def system_tags(system: SystemLite) -> list[Tag]:
+    tags: list[Tag] = [("system", system.system_id)]
+    if isinstance(system, System):
+        tags += [("game", g.game_id) for g in system.games]
+    return tags
+
 
 class SystemDB(DBConn):
     @convert(SystemLite)
@@ -24,7 +35,7 @@ class SystemDB(DBConn):
         emoji_animated: bool | None = None,
     ):
         abbreviation = abbreviation or name[:15]
-        return await conn.fetchrow(
+        record = await conn.fetchrow(
             """
             INSERT INTO Systems (
                 guild_id,
@@ -52,7 +63,11 @@ class SystemDB(DBConn):
             emoji_id,
             emoji_animated,
         )
+        self.cache.invalidate(("guild", guild_id))
+        return record
 
+    @cached("system_lite", "guild_id", "system_id", tags=system_tags)
+    @single_flight
     @convert(SystemLite)
     @with_conn
     async def get_lite(self, conn: Conn, *, system_id: int, guild_id: int):
@@ -67,26 +82,63 @@ class SystemDB(DBConn):
             guild_id,
         )
 
+    @cached("system", "guild_id", "system_id", "offset", "limit", tags=system_tags)
+    @single_flight
     @convert(System)
     @with_conn
-    async def get(self, conn: Conn, *, system_id: int, guild_id: int):
+    async def get(self, conn: Conn, *, system_id: int, guild_id: int, offset: int = 0, limit: int = GAMES_PER_PAGE):
+        """
+        A system with one page of its games, oldest first. `count_games` gives the total, for paginating.
+        """
+        # games are only filtered by system_id, which is already checked to be in the guild.
+        # postgres estimates rows per guild and system independently, so also filtering games by guild
+        # makes it expect a handful of games and sort them all, rather than read one page off the index.
         return await conn.fetchrow(
             """
             SELECT
                 s.*,
-                array_remove(array_agg(g), NULL) AS games
+                ARRAY(
+                    SELECT g
+                    FROM Games AS g
+                    WHERE g.system_id = $1
+                    ORDER BY g.game_id
+                    LIMIT $3
+                    OFFSET $4
+                ) AS games
             FROM Systems AS s
-            LEFT JOIN Games AS g USING (system_id)
             WHERE
-                system_id = $1
-                AND s.guild_id = $2
-                AND g.guild_id = $2
-            GROUP BY system_id;
+                s.system_id = $1
+                AND s.guild_id = $2;
             """,
             system_id,
             guild_id,
+            limit,
+            offset,
         )
 
+    @single_flight
+    @with_conn
+    async def count_games(self, conn: Conn, *, system_id: int, guild_id: int) -> int:
+        val = await conn.fetchval(
+            """
+            SELECT COUNT(game_id)
+            FROM Games
+            WHERE system_id = (
+                SELECT system_id
+                FROM Systems
+                WHERE
+                    system_id = $1
+                    AND guild_id = $2
+            );
+            """,
+            system_id,
+            guild_id,
+        )
+
+        assert isinstance(val, int)
+
+        return val
+
     @with_conn
     async def name_exists(self, conn: Conn, *, guild_id: int, name: str) -> bool:
         return await conn.fetchval(
@@ -119,6 +171,8 @@ class SystemDB(DBConn):
             system_id,
         )
 
+    @cached("system_lite", "guild_id", "system_id", tags=system_tags, refresh=True)
+    @convert(SystemLite)
     @with_conn
     async def update(
         self,
@@ -153,14 +207,15 @@ class SystemDB(DBConn):
         }
         args = kwargs.values()
         columns = ",\n".join(f"{k} = ${i + 3}" for i, k in enumerate(kwargs.keys()))
-        await conn.execute(
+        return await conn.fetchrow(
             f"""
             UPDATE Systems
             SET
                 {columns}
             WHERE
                 system_id = $1
-                AND guild_id = $2;
+                AND guild_id = $2
+            RETURNING *;
             """,
             system_id,
             guild_id,
@@ -178,7 +233,9 @@ class SystemDB(DBConn):
             """,
             system_id,
         )
+        self.cache.invalidate(("system", system_id))
 
+    @indexed(GuildIndex.systems_guild)
     @with_conn
     async def autocomplete(
         self, conn: Conn, ctx: crescent.AutocompleteContext, option: hikari.AutocompleteInteractionOption
@@ -191,13 +248,13 @@ class SystemDB(DBConn):
             WHERE
                 guild_id = $1
                 AND (
-                    name ILIKE $2
-                    OR abbreviation ILIKE $2
+                    lower(name) LIKE $2
+                    OR lower(abbreviation) LIKE $2
                 )
             LIMIT 25;
             """,
             ctx.guild_id,
-            f"{option.value}%",
+            prefix_pattern(option.value),
         )
 
         return [(r[1], str(r[0])) for r in results]
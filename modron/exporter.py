@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import typing
+
+from modron.metrics import Histogram
+
+if typing.TYPE_CHECKING:
+    from modron.model import Model
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# generous for a scraper, but stops idle connections from being held open
+READ_TIMEOUT = 5.0
+
+Labels = dict[str, str]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Exposition:
+    """
+    Builds a page in the Prometheus text exposition format.
+    """
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+
+    def _header(self, name: str, kind: str, help_text: str) -> None:
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def gauge(self, name: str, help_text: str, samples: typing.Iterable[tuple[Labels, float]]) -> None:
+        self._header(name, "gauge", help_text)
+        self.lines.extend(f"{name}{_labels(labels)} {_number(value)}" for labels, value in samples)
+
+    def counter(self, name: str, help_text: str, samples: typing.Iterable[tuple[Labels, float]]) -> None:
+        self._header(name, "counter", help_text)
+        self.lines.extend(f"{name}_total{_labels(labels)} {_number(value)}" for labels, value in samples)
+
+    def histogram(self, name: str, help_text: str, samples: typing.Iterable[tuple[Labels, Histogram]]) -> None:
+        self._header(name, "histogram", help_text)
+        for labels, histogram in samples:
+            for bound, count in histogram.cumulative():
+                self.lines.append(f"{name}_bucket{_labels({**labels, 'le': _number(bound)})} {count}")
+            self.lines.append(f"{name}_sum{_labels(labels)} {_number(histogram.sum)}")
+            self.lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+    def render(self) -> bytes:
+        return ("\n".join(self.lines) + "\n").encode()
+
+
+def collect(model: Model) -> Exposition:
+    metrics = model.metrics
+    page = Exposition()
+
+    interactions = metrics.interactions
+    page.counter(
+        "modron_interactions_started",
+        "Interactions received, by kind and name.",
+        (({"kind": kind, "name": name}, count) for (kind, name), count in interactions.started.items()),
+    )
+    page.histogram(
+        "modron_interaction_seconds",
+        "Time to handle interactions that completed without an error.",
+        (({"kind": kind, "name": name}, h) for (kind, name), h in interactions.latency.items()),
+    )
+
+    queries = metrics.queries.methods
+    page.histogram(
+        "modron_db_wait_seconds",
+        "Time DB methods spent waiting for a pooled connection.",
+        (({"method": method}, stats.wait) for method, stats in queries.items()),
+    )
+    page.histogram(
+        "modron_db_query_seconds",
+        "Time DB methods spent running once they had a connection.",
+        (({"method": method}, stats.duration) for method, stats in queries.items()),
+    )
+    page.histogram(
+        "modron_db_rows",
+        "Rows returned by DB methods.",
+        (({"method": method}, stats.rows) for method, stats in queries.items()),
+    )
+    page.counter(
+        "modron_db_errors",
+        "DB method calls that raised.",
+        (({"method": method}, stats.errors) for method, stats in queries.items()),
+    )
+
+    page.counter(
+        "modron_db_coalesced",
+        "DB method calls that shared a concurrent identical call instead of querying.",
+        (({"method": method}, count) for method, count in metrics.queries.coalesced.items()),
+    )
+
+    pool = model.db_pool
+    page.gauge(
+        "modron_db_pool_connections",
+        "Connections in the pool, by state.",
+        [
+            ({"state": "in_use"}, pool.get_size() - pool.get_idle_size()),
+            ({"state": "idle"}, pool.get_idle_size()),
+        ],
+    )
+    page.gauge("modron_db_pool_max_connections", "Most connections the pool will open.", [({}, pool.get_max_size())])
+
+    caches = [
+        ("model", model.cache.hits, model.cache.misses, len(model.cache.entries)),
+        (
+            "members",
+            model.render.member_lookups["cached"],
+            model.render.member_lookups["fetched"],
+            len(model.render.members),
+        ),
+    ]
+    if model.autocomplete is not None:
+        index = model.autocomplete
+        caches.append(("autocomplete", index.hits, index.misses, len(index.guilds)))
+    page.counter("modron_cache_hits", "Lookups served from memory.", (({"cache": c}, h) for c, h, _, _ in caches))
+    page.counter("modron_cache_misses", "Lookups that missed.", (({"cache": c}, m) for c, _, m, _ in caches))
+    page.gauge("modron_cache_entries", "Entries held in memory.", (({"cache": c}, n) for c, _, _, n in caches))
+
+    if model.notifier is not None:
+        page.counter(
+            "modron_cache_notifications",
+            "Cache invalidation notifications exchanged with other processes.",
+            [({"direction": "sent"}, model.notifier.sent), ({"direction": "received"}, model.notifier.received)],
+        )
+
+    page.counter(
+        "modron_member_lookups",
+        "Member lookups by how they were resolved. Everything but fetched avoided a REST call.",
+        (({"source": source}, count) for source, count in model.render.member_lookups.items()),
+    )
+
+    rest = metrics.rest
+    page.histogram(
+        "modron_rest_seconds",
+        "Discord REST calls made by the renderer and fabricator, by method.",
+        (({"route": route}, h) for route, h in rest.latency.items()),
+    )
+    page.counter(
+        "modron_rest_errors",
+        "Discord REST calls that raised, by method.",
+        (({"route": route}, count) for route, count in rest.errors.items()),
+    )
+    page.histogram(
+        "modron_rest_queue_seconds",
+        "Time fabricator REST calls waited in the scheduler before starting.",
+        [({}, rest.queue_wait)],
+    )
+    page.gauge("modron_rest_queued", "Fabricator REST calls waiting in the scheduler.", [({}, model.scheduler.queued)])
+
+    pipelines = metrics.pipelines
+    page.histogram(
+        "modron_pipeline_step_seconds",
+        "Time each step of a pipeline, such as posting feedback, took to run.",
+        (({"pipeline": p, "step": step}, h) for (p, step), h in pipelines.duration.items()),
+    )
+    page.histogram(
+        "modron_pipeline_step_finished_seconds",
+        "Time from the start of a pipeline until each of its steps finished.",
+        (({"pipeline": p, "step": step}, h) for (p, step), h in pipelines.finished.items()),
+    )
+    page.counter(
+        "modron_pipeline_step_errors",
+        "Pipeline steps that raised.",
+        (({"pipeline": p, "step": step}, count) for (p, step), count in pipelines.errors.items()),
+    )
+
+    reposter = model.reposter
+    page.counter(
+        "modron_menu_moves",
+        "Requests to move a feedback menu below new posts, by whether they moved it or joined a scheduled move.",
+        (({"outcome": outcome}, count) for outcome, count in reposter.outcomes.items()),
+    )
+    page.counter(
+        "modron_menu_calls_avoided",
+        "REST calls saved by coalescing menu moves.",
+        [({}, reposter.avoided_calls)],
+    )
+
+    page.histogram(
+        "modron_event_loop_lag_seconds", "How late the event loop ran a scheduled callback.", [({}, metrics.loop_lag)]
+    )
+
+    return page
+
+
+class Exporter:
+    """
+    Serves `/metrics` over plain HTTP on the bot's event loop, and watches the event loop's lag while running.
+    """
+
+    def __init__(self, model: Model, host: str, port: int) -> None:
+        self.model = model
+        self.host = host
+        self.port = port
+
+        self.server: asyncio.Server | None = None
+        self.lag_task: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.lag_task = asyncio.create_task(self.model.metrics.watch_loop_lag())
+        logger.info("serving metrics on http://%s:%d/metrics", self.host, self.port)
+
+    async def close(self) -> None:
+        if self.lag_task is not None:
+            self.lag_task.cancel()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), READ_TIMEOUT)
+            method, path, *_ = head.decode("latin-1").split(" ", 2)
+
+            if method != "GET":
+                status, body, content_type = "405 Method Not Allowed", b"", "text/plain"
+            elif path.split("?", 1)[0] != "/metrics":
+                status, body, content_type = "404 Not Found", b"", "text/plain"
+            else:
+                status, body, content_type = "200 OK", collect(self.model).render(), CONTENT_TYPE
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
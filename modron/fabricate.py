@@ -1,4 +1,5 @@
 import asyncio
+import math
 import typing
 
 import hikari
@@ -6,12 +7,26 @@ import hikari
 from modron.db.games import GameDB
 from modron.models import Game, GameLite
 
+# members discord returns per request when listing a guild's members
+MEMBERS_PER_PAGE = 1000
+
 
 class Fabricator:
-    def __init__(self, app_id: hikari.Snowflake, games: GameDB, client: hikari.api.RESTClient) -> None:
+    def __init__(
+        self,
+        app_id: hikari.Snowflake,
+        games: GameDB,
+        client: hikari.api.RESTClient,
+        cache: hikari.api.Cache | None = None,
+        *,
+        list_members: bool = False,
+    ) -> None:
         self.app_id = app_id
         self.client = client
         self.games = games
+        self.cache = cache
+        # listing a guild's members needs the privileged members intent
+        self.list_members = list_members
 
     def category_overwrites(self, game: GameLite) -> list[hikari.PermissionOverwrite]:
         perms = (
@@ -92,27 +107,75 @@ class Fabricator:
             game.role_id,
         )
 
-    async def remove_role(self, game: Game):
-        if game.role_id is None:
-            return
+    async def roles_of(
+        self, guild_id: hikari.Snowflake, user_ids: typing.Collection[hikari.Snowflake]
+    ) -> dict[hikari.Snowflake, typing.Sequence[hikari.Snowflake]]:
+        """
+        The roles of each member, from the gateway cache, or else from a listing of the guild's members
+        when that takes fewer requests than there are members missing. Members that can't be found are left out.
 
-        await asyncio.gather(
-            *[
-                self.remove_role_from(game, user_id)
-                for user_id in [game.author_id, *[player.user_id for player in game.players]]
-            ]
-        )
+        Both sources rely on `gateway.members`. Without it the cache only holds members seen in recent events,
+        and listing isn't allowed, so most members are missing. Fetching them one at a time would take a request
+        each, as many as changing their roles regardless.
+        """
+        roles: dict[hikari.Snowflake, typing.Sequence[hikari.Snowflake]] = {}
+        missing: set[hikari.Snowflake] = set()
+        for user_id in user_ids:
+            member = self.cache.get_member(guild_id, user_id) if self.cache is not None else None
+            if member is None:
+                missing.add(user_id)
+            else:
+                roles[user_id] = member.role_ids
 
-    async def apply_role(self, game: Game):
-        if game.role_id is None:
+        if missing and self.list_members and self._listing_requests(guild_id) < len(missing):
+            async for member in self.client.fetch_members(guild_id):
+                if member.id in missing:
+                    roles[member.id] = member.role_ids
+                    missing.discard(member.id)
+                    if not missing:
+                        break
+
+        return roles
+
+    def _listing_requests(self, guild_id: hikari.Snowflake) -> float:
+        guild = self.cache.get_guild(guild_id) if self.cache is not None else None
+        if guild is None or guild.member_count is None:
+            return math.inf
+        return math.ceil(guild.member_count / MEMBERS_PER_PAGE)
+
+    async def _change_role(self, game: Game, add: hikari.Snowflake | None, remove: hikari.Snowflake | None) -> None:
+        """
+        Give `add` to the author and players who don't have it, and take `remove` from those who do.
+        Members whose roles can't be found are changed regardless.
+        """
+        if add is None and remove is None:
             return
 
-        await asyncio.gather(
-            *[
-                self.apply_role_to(game, user_id)
-                for user_id in [game.author_id, *[player.user_id for player in game.players]]
-            ]
-        )
+        roster = list(dict.fromkeys([game.author_id, *[player.user_id for player in game.players]]))
+        roles = await self.roles_of(game.guild_id, roster)
+
+        calls: list[typing.Awaitable[None]] = []
+        for user_id in roster:
+            held = roles.get(user_id)
+            if remove is not None and (held is None or remove in held):
+                calls.append(self.client.remove_role_from_member(game.guild_id, user_id, remove))
+            if add is not None and (held is None or add not in held):
+                calls.append(self.client.add_role_to_member(game.guild_id, user_id, add))
+
+        await asyncio.gather(*calls)
+
+    async def sync_role(self, game: Game, previous_role_id: hikari.Snowflake | None = None):
+        """
+        Bring the game's role up to date with its roster, taking `previous_role_id`, the role it had before, away.
+        Only the roster is changed, since a role linked to a game may also be held by members outside it.
+        """
+        await self._change_role(game, game.role_id, None if previous_role_id == game.role_id else previous_role_id)
+
+    async def remove_role(self, game: Game):
+        await self._change_role(game, None, game.role_id)
+
+    async def apply_role(self, game: Game):
+        await self._change_role(game, game.role_id, None)
 
     async def apply_role_to(self, game: GameLite, user_id: hikari.Snowflake):
         if game.role_id is None:
@@ -168,20 +231,20 @@ class Fabricator:
             permission_overwrites=self.voice_overwrites(game, role_id),
         )
 
-    async def full_setup(self, game: GameLite) -> None:
+    async def full_setup(self, game: GameLite) -> Game:
         category, role = await asyncio.gather(
             self.create_channel_category(game),
             self.create_role(game),
         )
 
-        main, info, synopsis, voice = await asyncio.gather(
+        info, synopsis, main, voice = await asyncio.gather(
             self.create_read_only_channel(game, "info", category.id),
             self.create_read_only_channel(game, "synopsis", category.id),
             self.create_channel(game, "main", category.id),
             self.create_voice_channel(game, "Voice", role.id, category.id),
         )
 
-        await self.games.update(
+        updated = await self.games.update(
             game_id=game.game_id,
             guild_id=game.guild_id,
             author_id=game.author_id,
@@ -193,5 +256,5 @@ class Fabricator:
             voice_channel_id=voice.id,
         )
 
-        game = await self.games.get(game_id=game.game_id, guild_id=game.guild_id)
-        await self.apply_role(game)
+        await self.apply_role(updated)
+        return updated
@@ -0,0 +1,31 @@
+import hikari
+
+from modron.config import GatewayConfig
+
+
+def intents(config: GatewayConfig) -> hikari.Intents:
+    if config.profile == "full":
+        intents = hikari.Intents.ALL_UNPRIVILEGED
+    else:
+        # guilds and their roles, which permission checks read from the cache
+        intents = hikari.Intents.GUILDS
+        # the system emoji picker waits for a reaction
+        intents |= hikari.Intents.GUILD_MESSAGE_REACTIONS
+
+    if config.members:
+        intents |= hikari.Intents.GUILD_MEMBERS
+
+    return intents
+
+
+def cache_settings(config: GatewayConfig) -> hikari.impl.CacheSettings:
+    if config.profile == "full":
+        return hikari.impl.CacheSettings()
+
+    # permission checks need the member's guild and roles, and `utils.get_me` the bot user.
+    # without the members intent discord only sends the bot's own member, so there is nothing worth caching.
+    components = hikari.api.CacheComponents.GUILDS | hikari.api.CacheComponents.ROLES | hikari.api.CacheComponents.ME
+    if config.members:
+        components |= hikari.api.CacheComponents.MEMBERS
+
+    return hikari.impl.CacheSettings(components=components)
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import math
+import signal
+import sys
+import time
+from pathlib import Path
+
+import hikari
+
+from modron.config import Config
+
+logger = logging.getLogger(__name__)
+
+# discord allows `max_concurrency` shards to identify per 5 seconds, across every process
+IDENTIFY_INTERVAL = 5.0
+MIN_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+# a worker that stays up this long is healthy again, and its next restart isn't delayed
+STABLE_AFTER = 60.0
+# how long workers get to disconnect cleanly before they are killed
+SHUTDOWN_TIMEOUT = 30.0
+
+
+def shard_ranges(shard_count: int, processes: int) -> list[list[int]]:
+    """
+    Split the shards into contiguous ranges, one per process, as evenly as possible.
+    """
+    processes = min(processes, shard_count)
+    size, extra = divmod(shard_count, processes)
+
+    ranges: list[list[int]] = []
+    start = 0
+    for i in range(processes):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+
+    return ranges
+
+
+async def fetch_gateway_info(token: str) -> hikari.GatewayBotInfo:
+    app = hikari.RESTApp()
+    await app.start()
+    try:
+        async with app.acquire(token, token_type=hikari.TokenType.BOT) as rest:
+            return await rest.fetch_gateway_bot_info()
+    finally:
+        await app.close()
+
+
+class Worker:
+    """
+    A `python -m modron worker` process running a range of shards, restarted with backoff if it crashes.
+    """
+
+    def __init__(
+        self, config_path: Path, index: int, shard_ids: list[int], shard_count: int, start_delay: float
+    ) -> None:
+        self.config_path = config_path
+        # position among the workers, which offsets the metrics port so that each worker can serve its own
+        self.index = index
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.start_delay = start_delay
+
+        self.process: asyncio.subprocess.Process | None = None
+        self.backoff = MIN_BACKOFF
+
+    @property
+    def name(self) -> str:
+        if len(self.shard_ids) == 1:
+            return f"shard {self.shard_ids[0]}"
+        return f"shards {self.shard_ids[0]}-{self.shard_ids[-1]}"
+
+    async def run(self, stopping: asyncio.Event) -> None:
+        if await self._sleep(self.start_delay, stopping):
+            return
+
+        while not stopping.is_set():
+            started = time.monotonic()
+            self.process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                "-m",
+                "modron",
+                "-c",
+                str(self.config_path),
+                "worker",
+                "--shards",
+                ",".join(map(str, self.shard_ids)),
+                "--shard-count",
+                str(self.shard_count),
+                "--worker-index",
+                str(self.index),
+            )
+            logger.info("started worker for %s (pid %d)", self.name, self.process.pid)
+
+            code = await self.process.wait()
+            if stopping.is_set():
+                return
+            if code == 0:
+                logger.info("worker for %s exited", self.name)
+                return
+
+            if time.monotonic() - started > STABLE_AFTER:
+                self.backoff = MIN_BACKOFF
+            logger.error("worker for %s exited with %d, restarting in %.0fs", self.name, code, self.backoff)
+            if await self._sleep(self.backoff, stopping):
+                return
+            self.backoff = min(self.backoff * 2, MAX_BACKOFF)
+
+    def stop(self) -> None:
+        if self.process is not None and self.process.returncode is None:
+            # hikari closes the gateway connections gracefully on SIGTERM
+            self.process.terminate()
+
+    def kill(self) -> None:
+        if self.process is not None and self.process.returncode is None:
+            self.process.kill()
+
+    @staticmethod
+    async def _sleep(seconds: float, stopping: asyncio.Event) -> bool:
+        """
+        Sleep, returning early with True if the supervisor is stopping.
+        """
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(stopping.wait(), seconds)
+        return stopping.is_set()
+
+
+async def supervise(config_path: Path, config: Config) -> None:
+    """
+    Run the bot's shards across `config.shards.processes` worker processes until interrupted.
+    Each worker has its own event loop and database pool.
+    """
+    info = await fetch_gateway_info(config.discord_token)
+    shard_count = config.shards.count or info.shard_count
+    ranges = shard_ranges(shard_count, config.shards.processes)
+    concurrency = info.session_start_limit.max_concurrency
+
+    workers: list[Worker] = []
+    identified = 0
+    for index, shard_ids in enumerate(ranges):
+        # the shards of earlier workers identify first, so later workers wait for their turn
+        workers.append(
+            Worker(config_path, index, shard_ids, shard_count, math.ceil(identified / concurrency) * IDENTIFY_INTERVAL)
+        )
+        identified += len(shard_ids)
+
+    logger.info("running %d shards across %d processes", shard_count, len(workers))
+    if config.metrics.port:
+        logger.info("workers serve metrics on ports %d-%d", config.metrics.port, config.metrics.port + len(workers) - 1)
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    tasks = [asyncio.create_task(w.run(stopping)) for w in workers]
+    stop_task = asyncio.create_task(stopping.wait())
+    await asyncio.wait([stop_task, asyncio.gather(*tasks)], return_when=asyncio.FIRST_COMPLETED)
+
+    stopping.set()
+    for worker in workers:
+        worker.stop()
+    _, pending = await asyncio.wait(tasks, timeout=SHUTDOWN_TIMEOUT)
+    for worker in workers:
+        worker.kill()
+    if pending:
+        await asyncio.wait(pending)
+
+
+def run(config_path: Path, config: Config) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)-1.1s %(asctime)s %(name)s: %(message)s")
+    asyncio.run(supervise(config_path, config))
@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import collections
+import functools
+import inspect
+import logging
+import reprlib
+import time
+import types
+import typing
+
+import crescent
+import flare
+import hikari
+
+logger = logging.getLogger(__name__)
+
+# upper bounds, in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 1000)
+
+_arg_repr = reprlib.Repr()
+_arg_repr.maxstring = 40
+_arg_repr.maxother = 40
+
+
+class Histogram:
+    """
+    Counts observations into buckets by upper bound, for the lifetime of the process.
+    The most recent `window` observations are also kept, for percentiles over recent traffic.
+    """
+
+    def __init__(self, buckets: typing.Sequence[float], window: int = 1024) -> None:
+        self.buckets = tuple(buckets)
+        # one more than the buckets, for observations above the largest bound
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent: collections.deque[float] = collections.deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def cumulative(self) -> typing.Iterator[tuple[float, int]]:
+        """
+        Yield `(upper bound, observations at or below it)`, ending with infinity.
+        """
+        total = 0
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            total += count
+            yield bound, total
+
+    def percentile(self, p: float) -> float:
+        """
+        The `p`th percentile (0-100) of the recent observations, or 0 if there are none.
+        """
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+class QueryStats:
+    def __init__(self) -> None:
+        # waiting for a connection from the pool
+        self.wait = Histogram(LATENCY_BUCKETS)
+        # running the method once it has a connection
+        self.duration = Histogram(LATENCY_BUCKETS)
+        self.rows = Histogram(ROW_BUCKETS)
+        self.errors = 0
+
+
+class QueryMetrics:
+    """
+    Timings of each DB method, recorded by `with_conn`.
+    Calls taking longer than `slow_threshold` seconds in total are logged. 0 disables the log.
+    """
+
+    def __init__(self, slow_threshold: float = 0.0) -> None:
+        self.slow_threshold = slow_threshold
+        self.methods: dict[str, QueryStats] = {}
+        # calls that shared another call's result instead of querying, see `single_flight`
+        self.coalesced: collections.Counter[str] = collections.Counter()
+
+    def observe(
+        self,
+        method: str,
+        args: tuple[typing.Any, ...],
+        kwargs: dict[str, typing.Any],
+        *,
+        wait: float,
+        duration: float,
+        rows: int | None,
+    ) -> None:
+        stats = self.methods.get(method)
+        if stats is None:
+            stats = self.methods[method] = QueryStats()
+
+        stats.wait.observe(wait)
+        stats.duration.observe(duration)
+        if rows is None:
+            stats.errors += 1
+        else:
+            stats.rows.observe(rows)
+
+        if 0 < self.slow_threshold <= wait + duration:
+            arguments = ", ".join(
+                [*(_arg_repr.repr(a) for a in args), *(f"{k}={_arg_repr.repr(v)}" for k, v in kwargs.items())]
+            )
+            logger.warning(
+                "slow query %s(%s): %.1f ms (%.1f ms waiting for a connection, %s rows)",
+                method,
+                arguments,
+                (wait + duration) * 1000,
+                wait * 1000,
+                "failed, no" if rows is None else rows,
+            )
+
+
+def count_rows(result: typing.Any) -> int:
+    """
+    The number of rows a DB method returned, judging by its result.
+    Lists are counted, and anything else is one row unless it is None.
+    """
+    if isinstance(result, list):
+        return len(typing.cast(list[typing.Any], result))
+    return 0 if result is None else 1
+
+
+class InteractionMetrics:
+    """
+    Counts and timings of interactions, labelled by kind (command, component, or modal) and name.
+    Only interactions that complete without raising are timed, so `started` minus the timing count is failures.
+    """
+
+    # commands that raise never reach their after hook, so their start times are dropped past this many
+    MAX_PENDING = 1024
+
+    def __init__(self) -> None:
+        self.started: collections.Counter[tuple[str, str]] = collections.Counter()
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.pending: collections.OrderedDict[hikari.Snowflake, float] = collections.OrderedDict()
+        # flare components and modals whose callbacks are already timed
+        self.timed: set[type] = set()
+
+    def observe(self, kind: str, name: str, duration: float) -> None:
+        histogram = self.latency.get((kind, name))
+        if histogram is None:
+            histogram = self.latency[(kind, name)] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(duration)
+
+    @staticmethod
+    def command_name(ctx: crescent.Context) -> str:
+        return " ".join(p for p in (ctx.group, ctx.sub_group, ctx.command) if p)
+
+    async def before_command(self, ctx: crescent.Context) -> None:
+        """
+        A crescent command hook, to be paired with `after_command`.
+        """
+        self.started[("command", self.command_name(ctx))] += 1
+        self.pending[ctx.id] = time.perf_counter()
+        while len(self.pending) > self.MAX_PENDING:
+            self.pending.popitem(last=False)
+
+    async def after_command(self, ctx: crescent.Context) -> None:
+        start = self.pending.pop(ctx.id, None)
+        if start is not None:
+            self.observe("command", self.command_name(ctx), time.perf_counter() - start)
+
+    def time_components(self, module: types.ModuleType) -> None:
+        """
+        Time the callbacks of the flare components and modals defined in a module, labelled by their names.
+        """
+        for component in list(vars(module).values()):
+            if (
+                not isinstance(component, type)
+                or not issubclass(component, (flare.components.CallbackComponent, flare.Modal))
+                or component in self.timed
+                or "callback" not in vars(component)
+            ):
+                continue
+
+            kind = "modal" if issubclass(component, flare.Modal) else "component"
+            component.callback = self._timed_callback(kind, component.__name__, component.callback)
+            self.timed.add(component)
+
+    def _timed_callback(
+        self,
+        kind: str,
+        name: str,
+        callback: typing.Callable[[typing.Any, typing.Any], typing.Coroutine[typing.Any, typing.Any, None]],
+    ) -> typing.Callable[[typing.Any, typing.Any], typing.Coroutine[typing.Any, typing.Any, None]]:
+        label = (kind, name)
+
+        @functools.wraps(callback)
+        async def inner(component: typing.Any, ctx: typing.Any) -> None:
+            self.started[label] += 1
+            start = time.perf_counter()
+            await callback(component, ctx)
+            self.observe(*label, time.perf_counter() - start)
+
+        return inner
+
+
+class RESTMetrics:
+    def __init__(self) -> None:
+        self.latency: dict[str, Histogram] = {}
+        self.errors: collections.Counter[str] = collections.Counter()
+        # time calls spent queued in a `RESTScheduler` before starting
+        self.queue_wait = Histogram(LATENCY_BUCKETS)
+
+    def observe(self, route: str, duration: float, *, error: bool) -> None:
+        histogram = self.latency.get(route)
+        if histogram is None:
+            histogram = self.latency[route] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(duration)
+        if error:
+            self.errors[route] += 1
+
+
+class PipelineMetrics:
+    """
+    Timings of the steps of each `Pipeline`, labelled by pipeline and step.
+    """
+
+    def __init__(self) -> None:
+        # how long each step ran
+        self.duration: dict[tuple[str, str], Histogram] = {}
+        # how long after its pipeline started each step finished, e.g. how long a user waited for its result
+        self.finished: dict[tuple[str, str], Histogram] = {}
+        self.errors: collections.Counter[tuple[str, str]] = collections.Counter()
+
+    def observe(self, pipeline: str, step: str, duration: float, finished: float, *, error: bool) -> None:
+        key = (pipeline, step)
+        if key not in self.duration:
+            self.duration[key] = Histogram(LATENCY_BUCKETS)
+            self.finished[key] = Histogram(LATENCY_BUCKETS)
+        self.duration[key].observe(duration)
+        self.finished[key].observe(finished)
+        if error:
+            self.errors[key] += 1
+
+
+class InstrumentedREST:
+    """
+    Forwards to a `hikari.api.RESTClient`, timing each call by the name of the method called.
+    """
+
+    def __init__(self, rest: hikari.api.RESTClient, metrics: RESTMetrics) -> None:
+        self._rest = rest
+        self._metrics = metrics
+
+    def __getattr__(self, name: str) -> typing.Any:
+        attr = getattr(self._rest, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def timed(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+            start = time.perf_counter()
+            error = True
+            try:
+                result = await attr(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                self._metrics.observe(name, time.perf_counter() - start, error=error)
+
+        # later lookups find this directly, without going through __getattr__
+        setattr(self, name, timed)
+        return timed
+
+
+class Metrics:
+    def __init__(self, slow_query_seconds: float = 0.0) -> None:
+        self.queries = QueryMetrics(slow_query_seconds)
+        self.interactions = InteractionMetrics()
+        self.rest = RESTMetrics()
+        self.pipelines = PipelineMetrics()
+        # how late the event loop runs a callback scheduled for a known time
+        self.loop_lag = Histogram(LATENCY_BUCKETS)
+
+    async def watch_loop_lag(self, interval: float = 0.5) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            self.loop_lag.observe(max(0.0, loop.time() - start - interval))
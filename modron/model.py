@@ -1,24 +1,44 @@
+import typing
+
 import hikari
 
 from modron.config import Config
+from modron.db.autocomplete import AutocompleteIndex
+from modron.db.cache import ModelCache
 from modron.db.characters import CharacterDB
 from modron.db.conn import Pool, connect
 from modron.db.games import GameDB
+from modron.db.menus import MenuDB
+from modron.db.notify import CacheNotifier
 from modron.db.players import PlayerDB
 from modron.db.systems import SystemDB
+from modron.exporter import Exporter
 from modron.fabricate import Fabricator
+from modron.metrics import InstrumentedREST, Metrics
 from modron.render import Renderer
+from modron.reposter import MenuReposter
+from modron.scheduler import RESTScheduler, ScheduledREST
 
 
 class Model:
-    def __init__(self, config: Config) -> None:
+    def __init__(self, config: Config, worker_index: int = 0) -> None:
         self.config = config
+        self.worker_index = worker_index
+
+        self.cache = ModelCache(config.cache.max_size, config.cache.ttl)
+        self.metrics = Metrics(config.metrics.slow_query_seconds)
+        self.scheduler = RESTScheduler(metrics=self.metrics.rest)
+        self.reposter = MenuReposter(config.feedback.menu_delay)
+        self.exporter: Exporter | None = None
+        self.notifier: CacheNotifier | None = None
 
         self.db_pool: Pool
+        self.autocomplete: AutocompleteIndex | None
         self.systems: SystemDB
         self.games: GameDB
         self.players: PlayerDB
         self.characters: CharacterDB
+        self.menus: MenuDB
 
         self.app_id: hikari.Snowflake
 
@@ -26,11 +46,22 @@ class Model:
         self.fab: Fabricator
 
     async def start(self, client: hikari.api.RESTClient, cache: hikari.api.Cache | None = None) -> None:
-        self.db_pool = await connect(self.config.db_url)
-        self.systems = SystemDB(self.db_pool)
-        self.games = GameDB(self.db_pool)
-        self.players = PlayerDB(self.db_pool)
-        self.characters = CharacterDB(self.db_pool)
+        self.db_pool = await connect(self.config.db_url, self.config.pool)
+        if self.config.cache.notify or self.config.shards.processes > 1:
+            self.notifier = CacheNotifier(self.config.db_url, self.config.pool, self.cache)
+            await self.notifier.start()
+        self.autocomplete = (
+            AutocompleteIndex(
+                self.db_pool, self.cache, self.config.cache.autocomplete_guilds, metrics=self.metrics.queries
+            )
+            if self.config.cache.autocomplete_guilds > 0
+            else None
+        )
+        self.systems = SystemDB(self.db_pool, self.cache, self.autocomplete, metrics=self.metrics.queries)
+        self.games = GameDB(self.db_pool, self.cache, self.autocomplete, metrics=self.metrics.queries)
+        self.players = PlayerDB(self.db_pool, self.cache, metrics=self.metrics.queries)
+        self.characters = CharacterDB(self.db_pool, self.cache, self.autocomplete, metrics=self.metrics.queries)
+        self.menus = MenuDB(self.db_pool, self.cache, metrics=self.metrics.queries)
 
         application = await client.fetch_application()
         self.app_id = application.id
@@ -38,9 +69,35 @@ class Model:
         commands = await client.fetch_application_commands(application.id)
         command_ids = {c.name: c.id for c in commands if isinstance(c, hikari.SlashCommand)}
 
-        self.render = Renderer(command_ids, client, cache)
+        # REST calls made on behalf of commands are timed, by the name of the method called
+        rest = typing.cast(hikari.api.RESTClient, InstrumentedREST(client, self.metrics.rest))
+
+        self.render = Renderer(
+            command_ids,
+            rest,
+            cache,
+            member_cache_size=self.config.cache.members,
+            member_ttl=self.config.cache.member_ttl,
+        )
+
+        # the fabricator makes bursts of calls, such as a role for every player, which are queued per guild
+        self.fab = Fabricator(
+            self.app_id,
+            self.games,
+            typing.cast(hikari.api.RESTClient, ScheduledREST(rest, self.scheduler)),
+            cache,
+            list_members=self.config.gateway.members,
+        )
 
-        self.fab = Fabricator(self.app_id, self.games, client)
+        if self.config.metrics.port:
+            # each worker process serves its own shards' metrics, on the port after the previous worker's
+            self.exporter = Exporter(self, self.config.metrics.host, self.config.metrics.port + self.worker_index)
+            await self.exporter.start()
 
     async def close(self) -> None:
+        await self.reposter.close()
+        if self.exporter is not None:
+            await self.exporter.close()
+        if self.notifier is not None:
+            await self.notifier.close()
         await self.db_pool.close()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import typing
 from datetime import datetime
 from enum import Enum
@@ -7,24 +8,15 @@ from enum import Enum
 import attrs
 import hikari
 
-from modron.db.conn import Record
+from modron.db.conn import Record, enum_codec
+from modron.db.decode import decode, decode_all, decode_first, decoded
 
 
-def snowflake_or_none_converter(value: int | None) -> hikari.Snowflake | None:
-    if value is None:
-        return None
-    return hikari.Snowflake(value)
-
-
-def snowflake_converter(snowflake: int) -> hikari.Snowflake:
-    return hikari.Snowflake(snowflake)
-
-
-@attrs.define(kw_only=True)
+@attrs.frozen(kw_only=True)
 class SystemLite:
     system_id: int
 
-    guild_id: hikari.Snowflake = attrs.field(converter=snowflake_converter)
+    guild_id: hikari.Snowflake = decoded(hikari.Snowflake)
 
     name: str
     abbreviation: str
@@ -36,7 +28,7 @@ class SystemLite:
     image: str | None = None
 
     emoji_name: str | None
-    emoji_id: hikari.Snowflake | None = attrs.field(converter=snowflake_or_none_converter)
+    emoji_id: hikari.Snowflake | None = decoded(hikari.Snowflake, nullable=True)
     emoji_animated: bool
 
     @property
@@ -50,17 +42,15 @@ class SystemLite:
         return hikari.CustomEmoji(id=self.emoji_id, name=self.emoji_name, is_animated=self.emoji_animated)
 
 
-def games_converter(rs: list[Record]) -> list[GameLite]:
-    return [GameLite(**r) for r in rs]
+def games_decoder(rs: list[Record], row: Record) -> tuple[GameLite, ...]:
+    # every game shares one SystemLite, rather than referring back to the System, which would make a cycle
+    system = decode(SystemLite, row)
+    return decode_all(GameLite, rs, system=system, system_id=system.system_id, guild_id=system.guild_id)
 
 
-@attrs.define(kw_only=True)
+@attrs.frozen(kw_only=True)
 class System(SystemLite):
-    games: list[GameLite] = attrs.field(converter=games_converter)
-
-    def __attrs_post_init__(self) -> None:
-        for g in self.games:
-            object.__setattr__(g, "system", self)
+    games: tuple[GameLite, ...] = decoded(games_decoder, row=True)
 
 
 class GameStatus(typing.NamedTuple("GameStatus", label=str, description=str, color=str, emoji=str), Enum):
@@ -73,45 +63,45 @@ class GameStatus(typing.NamedTuple("GameStatus", label=str, description=str, col
         return self.name.lower()
 
 
-def system_converter(rs: list[dict[str, typing.Any]] | SystemLite | None):
+def system_decoder(rs: list[Record] | None) -> SystemLite | None:
     if rs is None:
         return None
-    if isinstance(rs, SystemLite):
-        return rs
-    return next((SystemLite(**r) for r in rs), None)
+    return decode_first(SystemLite, rs)
 
 
-def game_status_converter(s: str) -> GameStatus:
+# decoded by asyncpg, so that games nested in other rows arrive decoded too
+@enum_codec("game_status")
+def game_status_decoder(s: str) -> GameStatus:
     return GameStatus[s.upper()]
 
 
-@attrs.define(kw_only=True)
+@attrs.frozen(kw_only=True)
 class GameLite:
     game_id: int
 
     system_id: int | None = None
-    system: SystemLite | None = attrs.field(converter=system_converter, default=None)
+    system: SystemLite | None = decoded(system_decoder, default=None)
 
-    guild_id: hikari.Snowflake = attrs.field(converter=snowflake_converter)
-    author_id: hikari.Snowflake = attrs.field(converter=snowflake_converter)
+    guild_id: hikari.Snowflake = decoded(hikari.Snowflake)
+    author_id: hikari.Snowflake = decoded(hikari.Snowflake)
 
     name: str
     abbreviation: str = attrs.field()
     description: str | None = None
     image: str | None = None
 
-    status: GameStatus = attrs.field(converter=game_status_converter)
+    status: GameStatus
     seeking_players: bool
 
     created_at: datetime
 
-    role_id: hikari.Snowflake | None = attrs.field(converter=snowflake_or_none_converter)
+    role_id: hikari.Snowflake | None = decoded(hikari.Snowflake, nullable=True)
 
-    category_channel_id: int | None = attrs.field(converter=snowflake_or_none_converter)
-    main_channel_id: int | None = attrs.field(converter=snowflake_or_none_converter)
-    info_channel_id: int | None = attrs.field(converter=snowflake_or_none_converter)
-    synopsis_channel_id: int | None = attrs.field(converter=snowflake_or_none_converter)
-    voice_channel_id: int | None = attrs.field(converter=snowflake_or_none_converter)
+    category_channel_id: int | None = decoded(hikari.Snowflake, nullable=True)
+    main_channel_id: int | None = decoded(hikari.Snowflake, nullable=True)
+    info_channel_id: int | None = decoded(hikari.Snowflake, nullable=True)
+    synopsis_channel_id: int | None = decoded(hikari.Snowflake, nullable=True)
+    voice_channel_id: int | None = decoded(hikari.Snowflake, nullable=True)
 
     @abbreviation.default  # type: ignore
     def _default_abbreviation(self) -> str:
@@ -136,31 +126,48 @@ class GameLite:
         return self.system.player_label
 
 
-def characters_converter(rs: list[Record]) -> list[Character]:
-    return [Character(**r) for r in rs]
+def characters_decoder(rs: list[Record], row: Record) -> tuple[Character, ...]:
+    return decode_all(Character, rs, game_id=row["game_id"])
 
 
-def players_converter(rs: list[Record]) -> list[Player]:
-    return [Player(**r) for r in rs]
+def players_decoder(rs: list[Record], row: Record) -> tuple[Player, ...]:
+    return decode_all(Player, rs, game_id=row["game_id"])
 
 
-@attrs.define(kw_only=True)
+@attrs.frozen(kw_only=True)
 class Game(GameLite):
-    characters: list[Character] = attrs.field(converter=characters_converter)
-    players: list[Player] = attrs.field(converter=players_converter)
+    characters: tuple[Character, ...] = decoded(characters_decoder, row=True)
+    players: tuple[Player, ...] = decoded(players_decoder, row=True)
+
+    # built on first use. models are frozen, so these never go stale.
+    @functools.cached_property
+    def characters_by_id(self) -> dict[int, Character]:
+        return {c.character_id: c for c in self.characters}
+
+    @functools.cached_property
+    def players_by_character(self) -> dict[int, Player]:
+        return {p.character_id: p for p in self.players if p.character_id is not None}
 
     def get_character_for(self, player: Player) -> Character | None:
-        return next((c for c in self.characters if c.character_id == player.character_id), None)
+        if player.character_id is None:
+            return None
+        return self.characters_by_id.get(player.character_id)
 
     def get_player_for(self, character: Character) -> Player | None:
-        return next((p for p in self.players if p.character_id == character.character_id), None)
+        return self.players_by_character.get(character.character_id)
 
+    def roster(self) -> list[tuple[Player, Character | None]]:
+        """
+        Every player, in order, with the character they are playing.
+        """
+        return [(p, self.get_character_for(p)) for p in self.players]
 
-@attrs.define(kw_only=True)
+
+@attrs.frozen(kw_only=True)
 class Character:
     character_id: int
     game_id: int
-    author_id: hikari.Snowflake = attrs.field(converter=snowflake_converter)
+    author_id: hikari.Snowflake = decoded(hikari.Snowflake)
 
     name: str
 
@@ -172,9 +179,15 @@ class Character:
     image: str | None = None
 
 
-@attrs.define(kw_only=True)
+@attrs.frozen(kw_only=True)
 class Player:
-    user_id: hikari.Snowflake = attrs.field(converter=snowflake_converter)
+    user_id: hikari.Snowflake = decoded(hikari.Snowflake)
     game_id: int
 
     character_id: int | None = None
+
+
+@attrs.frozen(kw_only=True)
+class FeedbackMenu:
+    channel_id: hikari.Snowflake = decoded(hikari.Snowflake)
+    message_id: hikari.Snowflake = decoded(hikari.Snowflake)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import typing
+
+from modron.metrics import PipelineMetrics
+
+StepT = typing.TypeVar("StepT", bound=typing.Callable[..., typing.Awaitable[typing.Any]])
+
+
+class Pipeline:
+    """
+    Runs named async steps, each as soon as the steps it depends on have finished, so independent steps overlap.
+    A step is passed the results of the steps it depends on, in the order they were named.
+    If a step raises, the steps that depend on it don't run, the rest are cancelled, and `run` raises.
+
+    Each step is timed by how long it ran, and by how long after the pipeline started it finished.
+    """
+
+    def __init__(self, name: str, metrics: PipelineMetrics | None = None) -> None:
+        self.name = name
+        self.metrics = metrics
+        self.steps: dict[str, tuple[tuple[str, ...], typing.Callable[..., typing.Awaitable[typing.Any]]]] = {}
+
+    def step(self, name: str, *after: str) -> typing.Callable[[StepT], StepT]:
+        """
+        Add a step, which runs once the steps named in `after` have finished. They must already be added.
+        """
+
+        def decorator(f: StepT) -> StepT:
+            for dependency in after:
+                if dependency not in self.steps:
+                    raise ValueError(f"step {name} depends on {dependency}, which hasn't been added")
+            self.steps[name] = (after, f)
+            return f
+
+        return decorator
+
+    async def run(self) -> dict[str, typing.Any]:
+        """
+        Run every step, returning their results by name.
+        """
+        start = time.perf_counter()
+        tasks: dict[str, asyncio.Future[typing.Any]] = {}
+        # steps can only depend on steps added before them, so each dependency's task already exists
+        for name, (after, f) in self.steps.items():
+            tasks[name] = asyncio.ensure_future(self._run(name, f, [tasks[d] for d in after], start))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        return {name: task.result() for name, task in tasks.items()}
+
+    async def _run(
+        self,
+        name: str,
+        f: typing.Callable[..., typing.Awaitable[typing.Any]],
+        after: list[asyncio.Future[typing.Any]],
+        start: float,
+    ) -> typing.Any:
+        args = [await task for task in after]
+
+        began = time.perf_counter()
+        error = True
+        try:
+            result = await f(*args)
+            error = False
+            return result
+        finally:
+            if self.metrics is not None:
+                now = time.perf_counter()
+                self.metrics.observe(self.name, name, now - began, now - start, error=error)
@@ -4,6 +4,8 @@ import crescent
 import flare
 import hikari
 
+from modron.exceptions import NotFoundError
+from modron.pipeline import Pipeline
 from modron.utils import GuildContext, ModronPlugin, get_me
 
 plugin = ModronPlugin()
@@ -64,9 +66,8 @@ class AnonymousMessageModal(flare.Modal, title="Send Anonymous Message"):
             component=row,
         )
 
-        # move the anonymous message menu to the bottom of the channel
-        await delete_anon_menu(ctx.app, ctx.channel_id)
-        await send_anon_menu(ctx.app, ctx.channel_id)
+        # move the anonymous message menu to the bottom of the channel, once for a burst of messages
+        plugin.model.reposter.request(ctx.channel_id, lambda: move_anon_menu(ctx.app, ctx.channel_id))
 
 
 @flare.button(label="Send Anonymous Message", style=hikari.ButtonStyle.SECONDARY)
@@ -77,19 +78,47 @@ async def anonymous_button(ctx: flare.MessageContext) -> None:
     await AnonymousMessageModal().send(ctx.interaction)
 
 
+async def record_menu(message: hikari.Message) -> hikari.Message:
+    """
+    Record a menu that was just sent, so that it can be deleted by id when it moves.
+    """
+    await plugin.model.menus.set(channel_id=message.channel_id, message_id=message.id)
+    return message
+
+
+async def delete_recorded_menu(app: hikari.RESTAware, channel_id: hikari.Snowflake) -> bool:
+    """
+    Delete the menu recorded for the channel. Returns False if there is no record, and the channel must be searched.
+    """
+    try:
+        menu = await plugin.model.menus.get(channel_id=channel_id)
+    except NotFoundError:
+        return False
+
+    try:
+        await app.rest.delete_message(channel_id, menu.message_id)
+    except hikari.NotFoundError:
+        # the menu was already deleted by hand
+        pass
+    return True
+
+
 async def send_anon_menu(app: hikari.RESTAware, channel_id: hikari.Snowflake) -> hikari.Message:
     """
     Send a menu to a channel which lets users send anonymous messages in that channel.
     """
     row = await flare.Row(anonymous_button())
-    return await app.rest.create_message(channel_id, component=row)
+    return await record_menu(await app.rest.create_message(channel_id, component=row))
 
 
 async def delete_anon_menu(app: hikari.RESTAware, channel_id: hikari.Snowflake) -> None:
     """
-    Find the most recently sent anonymous message menu sent in the channel, and delete it.
-    Only searches the most recent 5 messages.
+    Delete the anonymous message menu in the channel.
+    Menus sent before they were recorded are searched for instead, in the most recent 5 messages.
     """
+    if await delete_recorded_menu(app, channel_id):
+        return
+
     # get the bot user before the loop
     me = await get_me(app)
 
@@ -113,6 +142,11 @@ async def delete_anon_menu(app: hikari.RESTAware, channel_id: hikari.Snowflake)
             break
 
 
+async def move_anon_menu(app: hikari.RESTAware, channel_id: hikari.Snowflake) -> None:
+    await delete_anon_menu(app, channel_id)
+    await send_anon_menu(app, channel_id)
+
+
 class ConfirmationModal(flare.Modal, title="Are you sure?"):
     """
     A confirmation dialog requiring the user to be very intentional when deleting a thread.
@@ -129,8 +163,10 @@ class ConfirmationModal(flare.Modal, title="Are you sure?"):
     async def callback(self, ctx: flare.ModalContext) -> None:
         # check if user input matches DELETE
         if self.confirmation.value == "DELETE":
-            # delete the thread
+            # delete the thread, and the record of its anonymous message menu
+            await plugin.model.reposter.cancel(self.thread_id)
             await ctx.app.rest.delete_channel(self.thread_id)
+            await plugin.model.menus.delete(channel_id=self.thread_id)
             # delete the "<bot_name> started a thread: <thread_title>" message
             await ctx.app.rest.delete_message(ctx.channel_id, self.thread_id)
             response = await ctx.respond(
@@ -194,20 +230,7 @@ class FeedbackModal(flare.Modal, title="Send Feedback"):
         # these are marked as required above, so they shouldn't be None
         assert self.name.value is not None
         assert self.content.value is not None
-
-        # create the thread with the name the user set
-        thread = await ctx.app.rest.create_thread(
-            ctx.channel_id,
-            hikari.ChannelType.GUILD_PUBLIC_THREAD,
-            self.name.value,
-        )
-
-        # send the delete thread menu to only the user who started the thread
-        manage_feedback_menu = await flare.Row(delete_feedback_button(thread_id=thread.id))
-        await ctx.respond(
-            flags=hikari.MessageFlag.EPHEMERAL,
-            component=manage_feedback_menu,
-        )
+        thread_name = self.name.value
 
         # create an embed containing the message set by the user
         feedback_embed = hikari.Embed(
@@ -223,8 +246,9 @@ class FeedbackModal(flare.Modal, title="Send Feedback"):
             # these interactions can only happen in guilds, as set in the `feedback` crescent.Group above
             assert ctx.guild_id is not None
 
-            # attempt to get guild-specific information, with interaction-provided information as a fallback
-            if (
+            # attempt to get guild-specific information, with interaction-provided information as a fallback.
+            # the interaction carries the member, so the cache is only needed when it doesn't
+            if (member := ctx.member) is not None or (
                 isinstance(ctx.app, hikari.CacheAware)
                 and (member := ctx.app.cache.get_member(ctx.guild_id, ctx.author)) is not None
             ):
@@ -238,18 +262,46 @@ class FeedbackModal(flare.Modal, title="Send Feedback"):
                     icon=ctx.author.avatar_url,
                 )
 
+        # most steps only need the thread, so they run alongside each other once it exists
+        pipeline = Pipeline("feedback", plugin.model.metrics.pipelines)
+
+        # acknowledge the modal while the thread is created, with an ephemeral response for the menu below
+        @pipeline.step("acknowledge")
+        async def acknowledge() -> None:
+            await ctx.defer(flags=hikari.MessageFlag.EPHEMERAL)
+
+        # create the thread with the name the user set
+        @pipeline.step("create_thread")
+        async def create_thread() -> hikari.GuildThreadChannel:
+            return await ctx.app.rest.create_thread(
+                ctx.channel_id,
+                hikari.ChannelType.GUILD_PUBLIC_THREAD,
+                thread_name,
+            )
+
+        # send the delete thread menu to only the user who started the thread
+        @pipeline.step("manage_menu", "acknowledge", "create_thread")
+        async def manage_menu(_: None, thread: hikari.GuildThreadChannel) -> None:
+            manage_feedback_menu = await flare.Row(delete_feedback_button(thread_id=thread.id))
+            await ctx.edit_response(component=manage_feedback_menu)
+
         # send a message using the embed generated above
-        await ctx.app.rest.create_message(
-            thread.id,
-            embed=feedback_embed,
-        )
+        @pipeline.step("post", "create_thread")
+        async def post(thread: hikari.GuildThreadChannel) -> None:
+            await ctx.app.rest.create_message(
+                thread.id,
+                embed=feedback_embed,
+            )
 
-        # send the anonymous message menu to the thread
-        await send_anon_menu(ctx.app, thread.id)
+        # send the anonymous message menu to the thread, below the message
+        @pipeline.step("anon_menu", "create_thread", "post")
+        async def anon_menu(thread: hikari.GuildThreadChannel, _: None) -> None:
+            await send_anon_menu(ctx.app, thread.id)
 
-        # move the feedback menu to the bottom of the channel
-        await delete_feedback_menu(ctx.app, ctx.channel_id)
-        await send_feedback_menu(ctx.app, ctx.channel_id)
+        await pipeline.run()
+
+        # move the feedback menu to the bottom of the channel, once for a burst of feedback
+        plugin.model.reposter.request(ctx.channel_id, lambda: move_feedback_menu(ctx.app, ctx.channel_id))
 
 
 @flare.button()
@@ -283,14 +335,17 @@ async def send_feedback_menu(app: hikari.RESTAware, channel_id: hikari.Snowflake
     )
 
     # send a message with brief instructions/information and buttons
-    return await app.rest.create_message(channel_id, embed=embed, component=row)
+    return await record_menu(await app.rest.create_message(channel_id, embed=embed, component=row))
 
 
 async def delete_feedback_menu(app: hikari.RESTAware, channel_id: hikari.Snowflake) -> None:
     """
-    Find the most recently sent feedback menu sent in the channel, and delete it.
-    Only searches the most recent 5 messages.
+    Delete the feedback menu in the channel.
+    Menus sent before they were recorded are searched for instead, in the most recent 5 messages.
     """
+    if await delete_recorded_menu(app, channel_id):
+        return
+
     # get the bot user before the loop
     me = await get_me(app)
 
@@ -317,6 +372,11 @@ async def delete_feedback_menu(app: hikari.RESTAware, channel_id: hikari.Snowfla
             break
 
 
+async def move_feedback_menu(app: hikari.RESTAware, channel_id: hikari.Snowflake) -> None:
+    await delete_feedback_menu(app, channel_id)
+    await send_feedback_menu(app, channel_id)
+
+
 @plugin.include
 @feedback.child
 @crescent.command(name="start", description="convert this channel into a feedback channel")
@@ -383,7 +443,9 @@ class FeedbackStop:
         # reset the channel permissions to defaults
         await ctx.app.rest.edit_channel(ctx.channel_id, permission_overwrites=[])
 
-        # delete the feedback menu
+        # delete the feedback menu, after any move of it that is scheduled or in progress
+        await plugin.model.reposter.cancel(ctx.channel_id)
         await delete_feedback_menu(ctx.app, ctx.channel_id)
+        await plugin.model.menus.delete(channel_id=ctx.channel_id)
 
         await ctx.respond("Success! This channel has been converted to a regular channel.", ephemeral=True)
@@ -38,13 +38,20 @@ AuthorAwareT = typing.TypeVar("AuthorAwareT", bound=AuthorAware)
 SignatureT = typing.Callable[[AuthorAwareT, flare.MessageContext], typing.Coroutine[typing.Any, typing.Any, None]]
 
 
+def editor_id(member: hikari.Member) -> int | None:
+    """
+    The author whose games `member` can edit, or None if they can edit every game.
+    """
+    perms = toolbox.members.calculate_permissions(member)
+    if (perms & MANAGE_GAME_PERMISSIONS) == MANAGE_GAME_PERMISSIONS:
+        return None
+    return member.id
+
+
 def only_author(f: SignatureT[AuthorAwareT]):
     async def inner(self: AuthorAwareT, ctx: flare.MessageContext) -> None:
         assert ctx.member is not None
-        perms = toolbox.members.calculate_permissions(ctx.member)
-        if (perms & MANAGE_GAME_PERMISSIONS) == MANAGE_GAME_PERMISSIONS:
-            return await f(self, ctx)
-        if ctx.user.id == self.author_id:
+        if editor_id(ctx.member) in (None, self.author_id):
             return await f(self, ctx)
         raise EditPermissionError("Game")
 
@@ -368,15 +375,13 @@ class GameChannelSelect(flare.ChannelSelect, min_values=0, max_values=1):
         assert ctx.member is not None
 
         await ctx.defer()
-        await plugin.model.games.update(
+        game = await plugin.model.games.update(
             game_id=self.game_id,
             guild_id=ctx.guild_id,
-            author_id=ctx.user.id,
+            author_id=editor_id(ctx.member),
             **typing.cast(ChannelUpdate, {f"{self.kind}_channel_id": next((int(c.id) for c in ctx.channels), None)}),
         )
 
-        game = await plugin.model.games.get(game_id=self.game_id, guild_id=ctx.guild_id)
-
         await ctx.edit_response(
             **await manage_connections_view(ctx.member, self.kind, game),
         )
@@ -397,20 +402,16 @@ class GameRoleSelect(flare.RoleSelect, placeholder="Select role", min_values=0,
 
         await ctx.defer()
 
-        game = await plugin.model.games.get(game_id=self.game_id, guild_id=ctx.guild_id)
-
-        await plugin.model.fab.remove_role(game)
+        previous = await plugin.model.games.get_lite(game_id=self.game_id, guild_id=ctx.guild_id)
 
-        await plugin.model.games.update(
+        game = await plugin.model.games.update(
             game_id=self.game_id,
             guild_id=ctx.guild_id,
-            author_id=ctx.user.id,
+            author_id=editor_id(ctx.member),
             role_id=next((c.id for c in ctx.roles), None),
         )
 
-        game = await plugin.model.games.get(game_id=self.game_id, guild_id=ctx.guild_id)
-
-        await plugin.model.fab.apply_role(game)
+        await plugin.model.fab.sync_role(game, previous.role_id)
 
         await ctx.edit_response(
             **await manage_connections_view(ctx.member, "role", game),
@@ -450,15 +451,14 @@ class ManagePlayerSelect(flare.TextSelect, min_values=1, max_values=1, placehold
 
     @classmethod
     async def make(cls, game: Game, selected: hikari.Snowflake | None) -> typing.Self:
+        members = await plugin.model.render.get_members(game.guild_id, (p.user_id for p in game.players))
+
         options: list[hikari.SelectMenuOption] = []
-        for player in game.players:
-            member = plugin.app.cache.get_member(game.guild_id, player.user_id) or await plugin.app.rest.fetch_member(
-                game.guild_id, player.user_id
-            )
-            character = game.get_character_for(player)
+        for player, character in game.roster():
             options.append(
                 hikari.SelectMenuOption(
-                    label=member.display_name,
+                    # players who left the guild are still listed, so that they can be removed
+                    label=plugin.model.render.member_name(members.get(player.user_id), player.user_id),
                     value=str(player.user_id),
                     description=character.name if character is not None else None,
                     emoji=None,
@@ -527,14 +527,14 @@ class StatusSelect(flare.TextSelect, min_values=1, max_values=1, placeholder="Ch
     @only_author
     async def callback(self, ctx: flare.MessageContext) -> None:
         assert ctx.guild_id is not None
+        assert ctx.member is not None
 
-        await plugin.model.games.update(
+        game = await plugin.model.games.update(
             game_id=self.game_id,
             guild_id=ctx.guild_id,
-            author_id=ctx.user.id,
+            author_id=editor_id(ctx.member),
             status=ctx.values[0],
         )
-        game = await plugin.model.games.get(game_id=self.game_id, guild_id=ctx.guild_id)
 
         await ctx.edit_response(
             **await manage_details_view(game),
@@ -597,14 +597,14 @@ class ToggleSeekingPlayers(flare.Button, style=hikari.ButtonStyle.PRIMARY):
     @only_author
     async def callback(self, ctx: flare.MessageContext):
         assert ctx.guild_id is not None
+        assert ctx.member is not None
 
-        await plugin.model.games.update(
+        game = await plugin.model.games.update(
             game_id=self.game_id,
             guild_id=ctx.guild_id,
-            author_id=ctx.user.id,
+            author_id=editor_id(ctx.member),
             seeking_players=not self.seeking_players,
         )
-        game = await plugin.model.games.get(game_id=self.game_id, guild_id=ctx.guild_id)
 
         await ctx.edit_response(**await players_settings_view(game))
 
@@ -695,15 +695,14 @@ class GameCreateModal(flare.Modal, title="New Game"):
             image=self.image.value or None,
         )
 
+        # full_setup gives the author the new role. otherwise there is no role yet
         if self.auto_setup:
-            await plugin.model.fab.full_setup(game_lite)
-
-        game = await plugin.model.games.get(
-            game_id=game_lite.game_id,
-            guild_id=ctx.guild_id,
-        )
-
-        await plugin.model.fab.apply_role(game)
+            game = await plugin.model.fab.full_setup(game_lite)
+        else:
+            game = await plugin.model.games.get(
+                game_id=game_lite.game_id,
+                guild_id=ctx.guild_id,
+            )
 
         await ctx.respond(
             **await settings_view(ctx.member, game),
@@ -734,20 +733,20 @@ class GameEditModal(flare.Modal, title="Edit Game"):
         assert self.name.value is not None
         # this can only be accessed in guilds, so this should not be None
         assert ctx.guild_id is not None
+        assert ctx.member is not None
 
         await ctx.defer()
 
-        await plugin.model.games.update(
+        game = await plugin.model.games.update(
             game_id=self.game_id,
             guild_id=ctx.guild_id,
-            author_id=ctx.user.id,
+            author_id=editor_id(ctx.member),
             name=self.name.value,
             # replace '' with None
             abbreviation=self.abbreviation.value or None,
             description=self.description.value or None,
             image=self.image.value or None,
         )
-        game = await plugin.model.games.get(game_id=self.game_id, guild_id=ctx.guild_id)
 
         await ctx.edit_response(**await manage_details_view(game))
 
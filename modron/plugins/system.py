@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import datetime
+import math
 import typing
 
 import crescent
@@ -9,6 +10,7 @@ import flare
 import hikari
 import toolbox
 
+from modron.db.systems import GAMES_PER_PAGE
 from modron.exceptions import AutocompleteSelectError, ConfirmationError, EditPermissionError, NotUniqueError
 from modron.models import SystemLite
 from modron.utils import GuildContext, ModronPlugin, Response
@@ -50,6 +52,32 @@ async def settings_view(system: SystemLite) -> Response:
             flare.Row(
                 EmojiButton.make(system.system_id, 60),
                 EditButton.make(system.system_id),
+                GamesButton.make(system.system_id, 0),
+            ),
+        ),
+    }
+
+
+async def games_view(system_id: int, guild_id: int, page: int) -> Response:
+    total = await plugin.model.systems.count_games(system_id=system_id, guild_id=guild_id)
+    pages = max(1, math.ceil(total / GAMES_PER_PAGE))
+    # games may have been deleted since the button was sent, leaving fewer pages
+    page = max(0, min(page, pages - 1))
+
+    system = await plugin.model.systems.get(system_id=system_id, guild_id=guild_id, offset=page * GAMES_PER_PAGE)
+
+    return {
+        "content": f"Games, page {page + 1} of {pages}" if total > 0 else "This system has no games yet",
+        "embeds": await plugin.model.render.system_games(system),
+        "components": await asyncio.gather(
+            flare.Row(
+                # flare only serializes non-negative ints, and the first page's button is disabled anyway
+                GamesButton.make(system_id, max(0, page - 1))
+                .set_label("Previous")
+                .set_emoji("◀️")
+                .set_disabled(page == 0),
+                GamesButton.make(system_id, page + 1).set_label("Next").set_emoji("▶️").set_disabled(page >= pages - 1),
+                BackButton.make(system_id),
             ),
         ),
     }
@@ -97,13 +125,30 @@ class BackButton(flare.Button, label="Back"):
     async def callback(self, ctx: flare.MessageContext) -> None:
         assert ctx.guild_id is not None
 
-        system = await plugin.model.systems.get(system_id=self.system_id, guild_id=ctx.guild_id)
+        system = await plugin.model.systems.get_lite(system_id=self.system_id, guild_id=ctx.guild_id)
 
         await ctx.edit_response(
             **await settings_view(system),
         )
 
 
+class GamesButton(flare.Button, label="Games", emoji="🎲"):
+    system_id: int
+    page: int
+
+    @classmethod
+    def make(cls, system_id: int, page: int) -> typing.Self:
+        return cls(system_id, page)
+
+    @require_permissions
+    async def callback(self, ctx: flare.MessageContext) -> None:
+        assert ctx.guild_id is not None
+
+        await ctx.edit_response(
+            **await games_view(self.system_id, ctx.guild_id, self.page),
+        )
+
+
 class EmojiButton(flare.Button, label="Set Emoji", emoji="🎨"):
     system_id: int
     timeout: int
@@ -135,7 +180,7 @@ class EmojiButton(flare.Button, label="Set Emoji", emoji="🎨"):
             except (hikari.NotFoundError, hikari.ComponentStateConflictError):
                 pass
 
-        await plugin.model.systems.update(
+        system = await plugin.model.systems.update(
             system_id=self.system_id,
             guild_id=ctx.guild_id,
             emoji_name=event.emoji_name,
@@ -143,8 +188,6 @@ class EmojiButton(flare.Button, label="Set Emoji", emoji="🎨"):
             emoji_animated=event.is_animated,
         )
 
-        system = await plugin.model.systems.get(system_id=self.system_id, guild_id=ctx.guild_id)
-
         await ctx.interaction.edit_message(old_message, **await settings_view(system))
 
 
@@ -281,7 +324,7 @@ class SystemEditModal(flare.Modal, title="Edit System"):
 
         await ctx.defer()
 
-        await plugin.model.systems.update(
+        system = await plugin.model.systems.update(
             system_id=self.system_id,
             guild_id=ctx.guild_id,
             name=self.name.value,
@@ -291,7 +334,6 @@ class SystemEditModal(flare.Modal, title="Edit System"):
             description=self.description.value or None,
             image=self.image.value or None,
         )
-        system = await plugin.model.systems.get_lite(system_id=self.system_id, guild_id=ctx.guild_id)
 
         await ctx.edit_response(
             **await settings_view(system),
@@ -1,10 +1,15 @@
-import itertools
+import asyncio
+import collections
+import time
 import typing
 
 import hikari
 
 from modron.models import Character, Game, GameLite, Player, System, SystemLite
 
+# most member fetches in flight at once, so that a large game doesn't burst through the rate limit
+MAX_MEMBER_FETCHES = 8
+
 
 class Renderer:
     def __init__(
@@ -12,15 +17,95 @@ class Renderer:
         command_ids: dict[str, hikari.Snowflake],
         client: hikari.api.RESTClient,
         cache: hikari.api.Cache | None = None,
+        *,
+        member_cache_size: int = 4096,
+        member_ttl: float = 60.0,
     ) -> None:
         self.client = client
         self.cache = cache
         self.command_ids = command_ids
 
-    async def get_member(self, guild_id: int, user_id: int) -> hikari.Member:
-        if self.cache is not None and (member := self.cache.get_member(guild_id, user_id)) is not None:
-            return member
-        return await self.client.fetch_member(guild_id, user_id)
+        # (guild_id, user_id) -> (expires_at, member), for members fetched over REST.
+        # this covers members the gateway cache doesn't hold, e.g. without the members intent.
+        self.members: collections.OrderedDict[tuple[int, int], tuple[float, hikari.Member]] = collections.OrderedDict()
+        self.member_cache_size = member_cache_size
+        self.member_ttl = member_ttl
+        # how each member lookup was resolved: "gateway", "cached", "shared", or "fetched"
+        self.member_lookups: collections.Counter[str] = collections.Counter()
+
+        self.fetching: dict[tuple[int, int], asyncio.Task[hikari.Member | None]] = {}
+        self.fetch_limit = asyncio.Semaphore(MAX_MEMBER_FETCHES)
+
+    async def get_member(self, guild_id: int, user_id: int) -> hikari.Member | None:
+        """
+        Resolve one member, or None if they aren't in the guild.
+        """
+        return (await self.get_members(guild_id, [user_id])).get(user_id)
+
+    async def get_members(self, guild_id: int, user_ids: typing.Iterable[int]) -> dict[int, hikari.Member]:
+        """
+        Resolve members from the gateway cache where possible.
+        The rest are fetched concurrently, sharing any fetch of the same member that is already in flight.
+        Users that aren't in the guild, such as players who left, are left out.
+        """
+        found: dict[int, hikari.Member] = {}
+        missing: dict[int, asyncio.Task[hikari.Member | None]] = {}
+        now = time.monotonic()
+
+        for user_id in user_ids:
+            if user_id in found or user_id in missing:
+                continue
+
+            if self.cache is not None and (member := self.cache.get_member(guild_id, user_id)) is not None:
+                self.member_lookups["gateway"] += 1
+                found[user_id] = member
+                continue
+
+            key = (guild_id, user_id)
+            cached = self.members.get(key)
+            if cached is not None:
+                if cached[0] > now:
+                    self.members.move_to_end(key)
+                    self.member_lookups["cached"] += 1
+                    found[user_id] = cached[1]
+                    continue
+                del self.members[key]
+
+            task = self.fetching.get(key)
+            if task is None:
+                self.member_lookups["fetched"] += 1
+                task = asyncio.create_task(self._fetch_member(guild_id, user_id))
+                self.fetching[key] = task
+                task.add_done_callback(lambda _, key=key: self.fetching.pop(key, None))
+            else:
+                self.member_lookups["shared"] += 1
+            missing[user_id] = task
+
+        if missing:
+            # other callers may be waiting on the same fetches, so one being cancelled shouldn't cancel them
+            members = await asyncio.gather(*(asyncio.shield(t) for t in missing.values()))
+            found.update((user_id, member) for user_id, member in zip(missing, members) if member is not None)
+
+        return found
+
+    async def _fetch_member(self, guild_id: int, user_id: int) -> hikari.Member | None:
+        async with self.fetch_limit:
+            try:
+                member = await self.client.fetch_member(guild_id, user_id)
+            except hikari.NotFoundError:
+                return None
+        if self.member_cache_size > 0:
+            self.members[(guild_id, user_id)] = (time.monotonic() + self.member_ttl, member)
+            while len(self.members) > self.member_cache_size:
+                self.members.popitem(last=False)
+        return member
+
+    @staticmethod
+    def member_name(member: hikari.Member | None, user_id: int) -> str:
+        """
+        The name to show for a member, which could be a user who has since left the guild.
+        """
+        return member.display_name if member is not None else f"{user_id} (left the server)"
 
     def mention_command(self, name: str) -> str:
         return f"</{name}:{self.command_ids.get(name.split()[0], None)}>"
@@ -41,7 +126,7 @@ class Renderer:
 
         return embed
 
-    async def system_games(self, system: System, *, start: int = 0, stop: int = 10) -> typing.Sequence[hikari.Embed]:
+    async def system_games(self, system: System) -> typing.Sequence[hikari.Embed]:
         return [
             hikari.Embed(
                 title=game.name,
@@ -57,7 +142,7 @@ class Renderer:
                 inline=True,
             )
             .add_field("More Details", self.mention_command("game info"), inline=True)
-            for game in itertools.islice(system.games, start, stop)
+            for game in system.games
         ]
 
     async def game(
@@ -140,7 +225,8 @@ class Renderer:
         member = await self.get_member(game.guild_id, game.author_id)
 
         return hikari.Embed(title=game.author_label).set_author(
-            name=member.display_name, icon=member.display_avatar_url
+            name=self.member_name(member, game.author_id),
+            icon=member.display_avatar_url if member is not None else None,
         )
 
     async def character(self, game: Game, character: Character, *, description: bool = False) -> hikari.Embed:
@@ -156,16 +242,22 @@ class Renderer:
         if (player := game.get_player_for(character)) is not None:
             member = await self.get_member(game.guild_id, player.user_id)
             embed.set_footer(game.player_label)
-            embed.set_author(name=member.display_name, icon=member.display_avatar_url)
+            embed.set_author(
+                name=self.member_name(member, player.user_id),
+                icon=member.display_avatar_url if member is not None else None,
+            )
 
         return embed
 
     async def player(self, game: Game, player: Player) -> hikari.Embed:
-        embed = hikari.Embed()
-
         member = await self.get_member(game.guild_id, player.user_id)
+
+        embed = hikari.Embed()
         embed.set_footer(game.player_label)
-        embed.set_author(name=member.display_name, icon=member.display_avatar_url)
+        embed.set_author(
+            name=self.member_name(member, player.user_id),
+            icon=member.display_avatar_url if member is not None else None,
+        )
 
         if (character := game.get_character_for(player)) is not None:
             embed.title = character.name
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import contextlib
+import logging
+import typing
+
+logger = logging.getLogger(__name__)
+
+# moving a menu deletes it and sends it again
+CALLS_PER_MOVE = 2
+
+
+class MenuReposter:
+    """
+    Moves menus to the bottom of their channel, coalescing bursts of requests into one move.
+
+    The first request for a channel schedules a move `delay` seconds later, and requests made before that move
+    starts are coalesced into it. Moves in a channel run one at a time, so that two moves can't both delete the
+    same menu and leave two new ones behind. Closing runs the scheduled moves straight away.
+    """
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+
+        # channel -> its next move, until that move starts
+        self.pending: dict[int, asyncio.Task[None]] = {}
+        self.locks: dict[int, asyncio.Lock] = {}
+        self.tasks: set[asyncio.Task[None]] = set()
+        # set on close, ending the delay of every scheduled move
+        self.closing = asyncio.Event()
+
+        # requests by outcome: "moved", "coalesced", or "failed"
+        self.outcomes: collections.Counter[str] = collections.Counter()
+
+    @property
+    def avoided_calls(self) -> int:
+        return self.outcomes["coalesced"] * CALLS_PER_MOVE
+
+    def request(self, channel_id: int, move: typing.Callable[[], typing.Awaitable[None]]) -> None:
+        """
+        Move the channel's menu with `move`, unless a move that hasn't started yet is already scheduled.
+        """
+        if channel_id in self.pending:
+            self.outcomes["coalesced"] += 1
+            return
+
+        task = asyncio.create_task(self._move(channel_id, move))
+        self.pending[channel_id] = task
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _move(self, channel_id: int, move: typing.Callable[[], typing.Awaitable[None]]) -> None:
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self.closing.wait(), self.delay)
+
+        lock = self.locks.setdefault(channel_id, asyncio.Lock())
+        async with lock:
+            # a move started now may be too early for messages sent after this, so they schedule the next one
+            if self.pending.get(channel_id) is asyncio.current_task():
+                del self.pending[channel_id]
+
+            try:
+                await move()
+            except Exception:
+                self.outcomes["failed"] += 1
+                logger.exception("moving the menu in channel %s failed", channel_id)
+            else:
+                self.outcomes["moved"] += 1
+
+        if channel_id not in self.pending:
+            self.locks.pop(channel_id, None)
+
+    async def cancel(self, channel_id: int) -> None:
+        """
+        Drop the channel's scheduled move, and wait for a move in progress to finish.
+        """
+        task = self.pending.pop(channel_id, None)
+        if task is not None:
+            task.cancel()
+
+        lock = self.locks.get(channel_id)
+        if lock is not None:
+            async with lock:
+                pass
+
+    async def close(self) -> None:
+        """
+        Run scheduled moves without waiting out their delay, and wait for every move to finish.
+        No menu is left deleted but not sent again, or above posts made before closing.
+        """
+        self.closing.set()
+        while self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
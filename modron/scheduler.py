@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+import functools
+import inspect
+import time
+import typing
+
+import hikari
+
+from modron.metrics import RESTMetrics
+
+ReturnT = typing.TypeVar("ReturnT")
+
+# calls in flight at once, across every guild
+MAX_CONCURRENCY = 8
+# calls started in any one second, under discord's global limit of 50 so that interactions keep some headroom
+MAX_RATE = 40
+RATE_PERIOD = 1.0
+# calls in flight at once per guild and route. hikari serializes each rate limit bucket anyway,
+# so more than one would only wait inside hikari, holding a slot that another guild could use.
+PER_ROUTE = 1
+
+# methods that discord rate limits as one route, so that they are queued together
+ROUTES = {
+    "add_role_to_member": "member_roles",
+    "remove_role_from_member": "member_roles",
+    "create_guild_category": "guild_channels",
+    "create_guild_text_channel": "guild_channels",
+    "create_guild_voice_channel": "guild_channels",
+}
+
+
+class _Call(typing.NamedTuple):
+    route: str
+    call: typing.Callable[[], typing.Awaitable[typing.Any]]
+    future: asyncio.Future[typing.Any]
+    queued_at: float
+
+
+class RESTScheduler:
+    """
+    Queues REST calls so that bursts, like giving a role to every player of a game, stay within discord's limits.
+
+    Calls are queued per guild, and guilds take turns, so one guild provisioning a large game doesn't hold up
+    the others. A call starts once there is a free slot, its route in that guild has nothing else in flight,
+    and fewer than `rate` calls started in the last second.
+    """
+
+    def __init__(
+        self,
+        *,
+        concurrency: int = MAX_CONCURRENCY,
+        rate: int = MAX_RATE,
+        per_route: int = PER_ROUTE,
+        metrics: RESTMetrics | None = None,
+    ) -> None:
+        self.concurrency = concurrency
+        self.rate = rate
+        self.per_route = per_route
+        self.metrics = metrics
+
+        # guild -> its queued calls. guilds are moved to the end once served, for round robin
+        self.queues: collections.OrderedDict[int, collections.deque[_Call]] = collections.OrderedDict()
+        self.running: collections.Counter[tuple[int, str]] = collections.Counter()
+        self.active = 0
+        # start times of recent calls, for the rate limit. a sliding window allows bursts, like discord's
+        self.started: collections.deque[float] = collections.deque()
+        self.wakeup: asyncio.TimerHandle | None = None
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self.queues.values())
+
+    async def run(self, guild_id: int, route: str, call: typing.Callable[[], typing.Awaitable[ReturnT]]) -> ReturnT:
+        future: asyncio.Future[ReturnT] = asyncio.get_running_loop().create_future()
+        self.queues.setdefault(guild_id, collections.deque()).append(
+            _Call(ROUTES.get(route, route), call, future, time.perf_counter())
+        )
+        self._dispatch()
+        return await future
+
+    def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self.active < self.concurrency and self.queues:
+            now = loop.time()
+            while self.started and self.started[0] <= now - RATE_PERIOD:
+                self.started.popleft()
+            if len(self.started) >= self.rate:
+                if self.wakeup is None:
+                    self.wakeup = loop.call_at(self.started[0] + RATE_PERIOD, self._wake)
+                return
+
+            picked = self._next()
+            if picked is None:
+                return
+            self.started.append(now)
+            self._start(*picked)
+
+    def _wake(self) -> None:
+        self.wakeup = None
+        self._dispatch()
+
+    def _next(self) -> tuple[int, _Call] | None:
+        """
+        Take the first call that can start, from the guild whose turn is next.
+        """
+        for guild_id, queue in list(self.queues.items()):
+            picked: _Call | None = None
+            for call in list(queue):
+                if call.future.done():
+                    # the caller was cancelled while this was queued
+                    queue.remove(call)
+                elif self.running[(guild_id, call.route)] < self.per_route:
+                    queue.remove(call)
+                    picked = call
+                    break
+
+            if not queue:
+                del self.queues[guild_id]
+            else:
+                self.queues.move_to_end(guild_id)
+
+            if picked is not None:
+                return guild_id, picked
+
+        return None
+
+    def _start(self, guild_id: int, call: _Call) -> None:
+        key = (guild_id, call.route)
+        self.active += 1
+        self.running[key] += 1
+        if self.metrics is not None:
+            self.metrics.queue_wait.observe(time.perf_counter() - call.queued_at)
+
+        task = asyncio.ensure_future(call.call())
+
+        def done(task: asyncio.Future[typing.Any]) -> None:
+            self.active -= 1
+            self.running[key] -= 1
+            if self.running[key] == 0:
+                del self.running[key]
+
+            if not call.future.done():
+                if task.cancelled():
+                    call.future.cancel()
+                elif (exc := task.exception()) is not None:
+                    call.future.set_exception(exc)
+                else:
+                    call.future.set_result(task.result())
+
+            self._dispatch()
+
+        task.add_done_callback(done)
+        # a caller that gives up cancels its request
+        call.future.add_done_callback(lambda f: task.cancel() if f.cancelled() else None)
+
+
+class ScheduledREST:
+    """
+    Forwards to a `hikari.api.RESTClient`, running each call through a `RESTScheduler`.
+    Calls are queued under the guild passed as their first argument, so only guild endpoints should be used.
+    """
+
+    def __init__(self, rest: hikari.api.RESTClient, scheduler: RESTScheduler) -> None:
+        self._rest = rest
+        self._scheduler = scheduler
+
+    def __getattr__(self, name: str) -> typing.Any:
+        attr = getattr(self._rest, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def scheduled(guild: hikari.SnowflakeishOr[hikari.PartialGuild], *args: typing.Any, **kwargs: typing.Any):
+            return await self._scheduler.run(int(guild), name, lambda: attr(guild, *args, **kwargs))
+
+        # later lookups find this directly, without going through __getattr__
+        setattr(self, name, scheduled)
+        return scheduled
@@ -0,0 +1,149 @@
+import inspect
+import statistics
+import time
+import tracemalloc
+import typing
+
+import attrs
+from devenv import seed_game, with_pool
+
+from modron.db.cache import ModelCache
+from modron.db.conn import Pool, Record
+from modron.db.decode import decode
+from modron.db.games import GameDB
+from modron.db.systems import SystemDB
+from modron.models import Character, Game, GameLite, Player, System, SystemLite
+
+BENCH_GUILD_ID = 2
+SIZES = [1, 10, 100, 500]
+ITERATIONS = 200
+
+# the model of each aggregated column, for `unpack`
+NESTED: dict[str, type[typing.Any]] = {
+    "games": GameLite,
+    "characters": Character,
+    "players": Player,
+}
+
+
+def unpack(model: type[typing.Any], record: Record, **shared: typing.Any) -> typing.Any:
+    """
+    Decode the way models were built before decoders were compiled, kept for comparison:
+    every record, nested or not, is unpacked as a mapping, and every field is converted by name.
+    """
+    fields = attrs.fields_dict(model)
+    values: dict[str, typing.Any] = dict(shared)
+    for name, value in record.items():
+        if name not in fields:
+            continue
+        if name == "system":
+            values[name] = next((unpack(SystemLite, r) for r in value), None)
+        elif name == "games":
+            system = unpack(SystemLite, record)
+            values[name] = tuple(unpack(GameLite, r, system=system) for r in value)
+        elif name in NESTED:
+            values[name] = tuple(unpack(NESTED[name], r) for r in value)
+        else:
+            decoder = fields[name].metadata.get("decode")
+            values[name] = decoder(value) if decoder is not None and value is not None else value
+    return model(**values)
+
+
+def time_us(f: typing.Callable[[], typing.Any]) -> float:
+    samples: list[float] = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        f()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(samples)
+
+
+async def retained_kb(model: type[typing.Any], fetch: typing.Callable[[], typing.Awaitable[Record]]) -> float:
+    """
+    The memory held by a model once the record it was decoded from is gone.
+    The record is fetched while tracing, since values it shares with the model are allocated with it.
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        record = await fetch()
+        result = decode(model, record)
+        del record
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del result
+    return retained / 1024
+
+
+async def seed_system(pool: Pool, games: int) -> int:
+    system_id: int = await pool.fetchval(
+        """
+        INSERT INTO Systems (guild_id, name, abbreviation, author_label, player_label)
+        VALUES ($1, 'seed ' || substr(md5(random()::text), 1, 20), 'seed', 'GM', 'Player')
+        RETURNING system_id;
+        """,
+        BENCH_GUILD_ID,
+    )
+    await pool.execute(
+        """
+        INSERT INTO Games (system_id, guild_id, author_id, name, abbreviation)
+        SELECT $1, $2, n, 'game ' || substr(md5(random()::text), 1, 20), 'game'
+        FROM generate_series(1, $3) AS n;
+        """,
+        system_id,
+        BENCH_GUILD_ID,
+        games,
+    )
+    return system_id
+
+
+@with_pool
+async def bench(pool: Pool):
+    # the undecorated methods return the raw record, so only decoding is timed
+    fetch_system = inspect.unwrap(SystemDB.get)
+    fetch_game = inspect.unwrap(GameDB.get)
+    systems = SystemDB(pool, ModelCache(max_size=0))
+    games = GameDB(pool, ModelCache(max_size=0))
+
+    print(f"median of {ITERATIONS} runs, in microseconds")
+    print(f"{'record':<28} {'unpacked us':>12} {'compiled us':>12} {'speedup':>8} {'model KB':>9}")
+
+    try:
+        for size in SIZES:
+            system_id = await seed_system(pool, size)
+            game_id = await seed_game(pool, guild_id=BENCH_GUILD_ID, players=size, characters=size)
+
+            async def fetch_system_record() -> Record:
+                async with pool.acquire() as conn:
+                    return await fetch_system(systems, conn, system_id=system_id, guild_id=BENCH_GUILD_ID, limit=size)
+
+            async def fetch_game_record() -> Record:
+                async with pool.acquire() as conn:
+                    return await fetch_game(games, conn, game_id=game_id, guild_id=BENCH_GUILD_ID)
+
+            for name, model, fetch in [
+                (f"System with {size} games", System, fetch_system_record),
+                (f"Game with {size} players", Game, fetch_game_record),
+            ]:
+                record = await fetch()
+                assert unpack(model, record) == decode(model, record)
+                old = time_us(lambda: unpack(model, record))
+                new = time_us(lambda: decode(model, record))
+                kb = await retained_kb(model, fetch)
+                print(f"{name:<28} {old:>12.1f} {new:>12.1f} {old / new:>7.1f}x {kb:>9.1f}")
+    finally:
+        await pool.execute(
+            "DELETE FROM Players WHERE game_id IN (SELECT game_id FROM Games WHERE guild_id = $1);", BENCH_GUILD_ID
+        )
+        await pool.execute(
+            "DELETE FROM Characters WHERE game_id IN (SELECT game_id FROM Games WHERE guild_id = $1);", BENCH_GUILD_ID
+        )
+        await pool.execute("DELETE FROM Games WHERE guild_id = $1;", BENCH_GUILD_ID)
+        await pool.execute("DELETE FROM Systems WHERE guild_id = $1;", BENCH_GUILD_ID)
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    asyncio.run(bench())
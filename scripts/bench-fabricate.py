@@ -0,0 +1,187 @@
+import os
+import sys
+
+sys.path.insert(0, os.getcwd())
+
+import asyncio
+import collections
+import statistics
+import time
+import typing
+from datetime import datetime
+
+import hikari
+from aiohttp import web
+
+from modron.db.games import GameDB
+from modron.fabricate import Fabricator
+from modron.models import Game, GameStatus, Player
+from modron.scheduler import RESTScheduler, ScheduledREST
+
+HOST = "127.0.0.1"
+PORT = 8456
+APP_ID = hikari.Snowflake(1)
+ROLE_ID = hikari.Snowflake(2)
+
+# one large game provisioned while smaller games in other guilds are too
+LARGE_GAME = 50
+SMALL_GAMES = 9
+SMALL_GAME = 5
+
+# limits of the fake server, scaled down from discord's so that a run takes seconds.
+# member roles are limited per guild, and everything is limited globally
+ROUTE_LIMIT = 10
+ROUTE_PERIOD = 0.5
+GLOBAL_LIMIT = 50
+GLOBAL_PERIOD = 1.0
+# round trip time of each request
+LATENCY = 0.02
+
+
+class FakeDiscord:
+    """
+    Enough of discord's REST API for `Fabricator.apply_role`, rate limited the way discord does it:
+    a fixed window per guild for the route, and a sliding window over every request.
+    """
+
+    def __init__(self) -> None:
+        self.windows: dict[str, tuple[float, int]] = {}
+        self.recent: collections.deque[float] = collections.deque()
+        self.served = 0
+        self.limited: collections.Counter[str] = collections.Counter()
+
+        self.app = web.Application()
+        self.app.router.add_put("/api/v10/guilds/{guild}/members/{user}/roles/{role}", self.add_role)
+
+    def reset(self) -> None:
+        self.windows.clear()
+        self.recent.clear()
+        self.served = 0
+        self.limited.clear()
+
+    async def add_role(self, request: web.Request) -> web.Response:
+        await asyncio.sleep(LATENCY)
+        now = time.monotonic()
+
+        while self.recent and self.recent[0] <= now - GLOBAL_PERIOD:
+            self.recent.popleft()
+        if len(self.recent) >= GLOBAL_LIMIT:
+            self.limited["global"] += 1
+            retry_after = self.recent[0] + GLOBAL_PERIOD - now
+            return web.json_response(
+                {"message": "You are being rate limited.", "retry_after": retry_after, "global": True},
+                status=429,
+                headers={"X-RateLimit-Global": "true", "X-RateLimit-Scope": "global"},
+            )
+
+        guild = request.match_info["guild"]
+        start, used = self.windows.get(guild, (now, 0))
+        if now >= start + ROUTE_PERIOD:
+            start, used = now, 0
+        reset_after = start + ROUTE_PERIOD - now
+        headers = {
+            "X-RateLimit-Bucket": "member-roles",
+            "X-RateLimit-Limit": str(ROUTE_LIMIT),
+            "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+        }
+
+        if used >= ROUTE_LIMIT:
+            self.limited["route"] += 1
+            return web.json_response(
+                {"message": "You are being rate limited.", "retry_after": reset_after, "global": False},
+                status=429,
+                headers={**headers, "X-RateLimit-Remaining": "0", "X-RateLimit-Scope": "user"},
+            )
+
+        self.windows[guild] = (start, used + 1)
+        self.recent.append(now)
+        self.served += 1
+        return web.Response(status=204, headers={**headers, "X-RateLimit-Remaining": str(ROUTE_LIMIT - used - 1)})
+
+
+def game(guild_id: int, players: int) -> Game:
+    return Game(
+        game_id=guild_id,
+        guild_id=hikari.Snowflake(guild_id),
+        author_id=hikari.Snowflake(guild_id * 1000),
+        name=f"game {guild_id}",
+        status=GameStatus.RUNNING,
+        seeking_players=False,
+        created_at=datetime.now(),
+        role_id=ROLE_ID,
+        category_channel_id=None,
+        main_channel_id=None,
+        info_channel_id=None,
+        synopsis_channel_id=None,
+        voice_channel_id=None,
+        characters=(),
+        players=tuple(
+            Player(user_id=hikari.Snowflake(guild_id * 1000 + i), game_id=guild_id) for i in range(1, players + 1)
+        ),
+    )
+
+
+def scenarios() -> list[tuple[str, list[Game]]]:
+    large = game(100, LARGE_GAME)
+    small = [game(200 + i, SMALL_GAME) for i in range(SMALL_GAMES)]
+    return [
+        (f"one game of {LARGE_GAME} players", [large]),
+        (f"and {SMALL_GAMES} games of {SMALL_GAME} in other guilds", [large, *small]),
+    ]
+
+
+async def provision(fab: Fabricator, games: list[Game]) -> tuple[float, float, float]:
+    """
+    Apply every game's role at once, returning the total time, the first game's time,
+    and the median time of the rest.
+    """
+    start = time.perf_counter()
+
+    async def timed(g: Game) -> float:
+        await fab.apply_role(g)
+        return time.perf_counter() - start
+
+    times = await asyncio.gather(*(timed(g) for g in games))
+    return time.perf_counter() - start, times[0], statistics.median(times[1:]) if len(times) > 1 else 0.0
+
+
+async def bench():
+    server = FakeDiscord()
+    runner = web.AppRunner(server.app)
+    await runner.setup()
+    await web.TCPSite(runner, HOST, PORT).start()
+
+    print(f"limits: {ROUTE_LIMIT} per {ROUTE_PERIOD}s per guild, {GLOBAL_LIMIT} per {GLOBAL_PERIOD}s globally")
+    print(
+        f"{'scenario':<36} {'client':<10} {'total s':>8} {'large s':>8} {'small s':>8} {'429 route':>10} {'429 global':>11}"
+    )
+
+    clients: list[tuple[str, typing.Callable[[hikari.api.RESTClient], typing.Any]]] = [
+        ("hikari", lambda rest: rest),
+        ("scheduled", lambda rest: ScheduledREST(rest, RESTScheduler())),
+    ]
+    try:
+        for scenario, games in scenarios():
+            for name, wrap in clients:
+                # a fresh client for each, so that no rate limits are known up front
+                app = hikari.RESTApp(url=f"http://{HOST}:{PORT}/api/v10")
+                await app.start()
+                try:
+                    async with app.acquire("token", token_type=hikari.TokenType.BOT) as rest:
+                        server.reset()
+                        fab = Fabricator(APP_ID, typing.cast(GameDB, None), wrap(rest))
+                        total, large, small = await provision(fab, games)
+                        # the author and every player
+                        assert server.served == sum(len(g.players) + 1 for g in games)
+                        print(
+                            f"{scenario:<36} {name:<10} {total:>8.2f} {large:>8.2f} {small:>8.2f} "
+                            f"{server.limited['route']:>10} {server.limited['global']:>11}"
+                        )
+                finally:
+                    await app.close()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(bench())
@@ -0,0 +1,68 @@
+import statistics
+import time
+import typing
+
+from devenv import seed_game, with_pool
+
+from modron.db.cache import ModelCache
+from modron.db.conn import Pool
+from modron.db.games import GameDB
+
+BENCH_GUILD_ID = 1
+SIZES = [1, 10, 25, 40, 100]
+ITERATIONS = 200
+
+# the query GameDB.get used before relations were aggregated separately, kept for comparison
+CARTESIAN_QUERY = """
+SELECT
+    g.*,
+    array_remove(array_agg(s), NULL) AS system,
+    array_remove(array_agg(c), NULL) AS characters,
+    array_remove(array_agg(p), NULL) AS players
+FROM Games AS g
+LEFT JOIN Systems AS s USING (system_id)
+LEFT JOIN Characters AS c USING (game_id)
+LEFT JOIN Players AS p USING (game_id)
+WHERE
+    game_id = $1
+    AND g.guild_id = $2
+GROUP BY game_id;
+"""
+
+
+async def time_ms(f: typing.Callable[[], typing.Awaitable[typing.Any]]) -> float:
+    samples: list[float] = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        await f()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+@with_pool
+async def bench(pool: Pool):
+    games = GameDB(pool, ModelCache(max_size=0))
+
+    print(f"median of {ITERATIONS} runs, players = characters = size")
+    print(f"{'size':>6} {'cartesian ms':>14} {'aggregated ms':>14} {'cartesian players':>18} {'players':>8}")
+
+    try:
+        for size in SIZES:
+            game_id = await seed_game(pool, guild_id=BENCH_GUILD_ID, players=size, characters=size)
+
+            old = await pool.fetchrow(CARTESIAN_QUERY, game_id, BENCH_GUILD_ID)
+            new = await games.get(game_id=game_id, guild_id=BENCH_GUILD_ID)
+            assert old is not None
+
+            old_ms = await time_ms(lambda: pool.fetchrow(CARTESIAN_QUERY, game_id, BENCH_GUILD_ID))
+            new_ms = await time_ms(lambda: games.get(game_id=game_id, guild_id=BENCH_GUILD_ID))
+
+            print(f"{size:>6} {old_ms:>14.3f} {new_ms:>14.3f} {len(old['players']):>18} {len(new.players):>8}")
+    finally:
+        await pool.execute("DELETE FROM Games WHERE guild_id = $1;", BENCH_GUILD_ID)
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    asyncio.run(bench())
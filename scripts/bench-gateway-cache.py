@@ -0,0 +1,231 @@
+import argparse
+import asyncio
+import gc
+import json
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.getcwd())
+
+import hikari
+
+from modron import gateway
+from modron.config import GatewayConfig
+
+GUILDS = 2500
+CHANNELS_PER_GUILD = 40
+ROLES_PER_GUILD = 30
+EMOJIS_PER_GUILD = 20
+VOICE_PER_GUILD = 5
+# members discord sends in GUILD_CREATE with the members intent, up to the large threshold
+MEMBERS_PER_GUILD = 250
+MESSAGES = 20_000
+
+BOT_ID = 1
+
+
+def user(user_id: int) -> dict[str, object]:
+    return {"id": str(user_id), "username": f"user{user_id}", "discriminator": "0", "avatar": None}
+
+
+def member(user_id: int, role_ids: list[int]) -> dict[str, object]:
+    return {
+        "user": user(user_id),
+        "nick": None,
+        "roles": [str(r) for r in role_ids],
+        "joined_at": "2023-01-01T00:00:00+00:00",
+        "deaf": False,
+        "mute": False,
+    }
+
+
+def guild_create(guild_id: int, *, members: bool) -> dict[str, object]:
+    """
+    A GUILD_CREATE payload shaped like one discord would send for the given intents.
+    """
+    base = guild_id * 10_000
+    role_ids = [guild_id, *range(base + 1, base + ROLES_PER_GUILD)]
+    voice_ids = [base + 5000 + n for n in range(VOICE_PER_GUILD)]
+
+    # without the members intent, discord only sends the bot and users in voice
+    member_ids = [BOT_ID, *voice_ids]
+    if members:
+        member_ids += range(base + 6000, base + 6000 + MEMBERS_PER_GUILD - len(member_ids))
+
+    return {
+        "id": str(guild_id),
+        "name": f"guild {guild_id}",
+        "icon": None,
+        "splash": None,
+        "discovery_splash": None,
+        "owner_id": str(base + 6000),
+        "afk_channel_id": None,
+        "afk_timeout": 300,
+        "verification_level": 0,
+        "default_message_notifications": 0,
+        "explicit_content_filter": 0,
+        "roles": [
+            {
+                "id": str(r),
+                "name": f"role {r}",
+                "color": 0,
+                "hoist": False,
+                "position": i,
+                "permissions": "0",
+                "managed": False,
+                "mentionable": False,
+            }
+            for i, r in enumerate(role_ids)
+        ],
+        "emojis": [
+            {
+                "id": str(base + 1000 + n),
+                "name": f"emoji{n}",
+                "roles": [],
+                "require_colons": True,
+                "animated": False,
+                "managed": False,
+                "available": True,
+            }
+            for n in range(EMOJIS_PER_GUILD)
+        ],
+        "stickers": [],
+        "features": [],
+        "mfa_level": 0,
+        "application_id": None,
+        "system_channel_id": None,
+        "system_channel_flags": 0,
+        "rules_channel_id": None,
+        "joined_at": "2023-01-01T00:00:00+00:00",
+        "large": members,
+        "unavailable": False,
+        "member_count": 1000,
+        "vanity_url_code": None,
+        "description": None,
+        "banner": None,
+        "premium_tier": 0,
+        "preferred_locale": "en-US",
+        "public_updates_channel_id": None,
+        "nsfw_level": 0,
+        "premium_progress_bar_enabled": False,
+        "channels": [
+            {
+                "id": str(base + 2000 + n),
+                "type": 0,
+                "guild_id": str(guild_id),
+                "name": f"channel-{n}",
+                "position": n,
+                "permission_overwrites": [],
+                "nsfw": False,
+                "topic": "a channel topic of reasonable length",
+                "last_message_id": None,
+                "rate_limit_per_user": 0,
+                "parent_id": None,
+            }
+            for n in range(CHANNELS_PER_GUILD)
+        ],
+        "threads": [],
+        "members": [member(m, role_ids[1:4]) for m in member_ids],
+        "voice_states": [
+            {
+                "channel_id": str(base + 2000),
+                "user_id": str(v),
+                "session_id": f"session{v}",
+                "deaf": False,
+                "mute": False,
+                "self_deaf": False,
+                "self_mute": False,
+                "self_video": False,
+                "suppress": False,
+                "request_to_speak_timestamp": None,
+            }
+            for v in voice_ids
+        ],
+        "presences": [],
+        "stage_instances": [],
+        "guild_scheduled_events": [],
+    }
+
+
+def message_create(n: int) -> dict[str, object]:
+    guild_id = 100 + n % GUILDS
+    return {
+        "id": str(10**15 + n),
+        "channel_id": str(guild_id * 10_000 + 2000),
+        "guild_id": str(guild_id),
+        "author": user(guild_id * 10_000 + 6000),
+        "content": "",
+        "timestamp": "2023-01-01T00:00:00+00:00",
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+        "flags": 0,
+    }
+
+
+def rss() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+async def simulate(profile: str, members: bool) -> dict[str, object]:
+    config = GatewayConfig(profile=profile, members=members)
+    intents = gateway.intents(config)
+    bot = hikari.GatewayBot("simulated", banner=None, intents=intents, cache_settings=gateway.cache_settings(config))
+    shard = SimpleNamespace(id=0, intents=intents, get_user_id=lambda: hikari.Snowflake(BOT_ID))
+
+    gc.collect()
+    before = rss()
+
+    for guild_id in range(100, 100 + GUILDS):
+        await bot.event_manager.on_guild_create(shard, guild_create(guild_id, members=members))  # type: ignore
+    if intents & hikari.Intents.GUILD_MESSAGES:
+        for n in range(MESSAGES):
+            await bot.event_manager.on_message_create(shard, message_create(n))  # type: ignore
+
+    gc.collect()
+    return {
+        "profile": profile,
+        "members": members,
+        "intents": str(intents),
+        "rss_mb": (rss() - before) / 2**20,
+        "guilds": len(bot.cache.get_guilds_view()),
+        "cached_members": sum(len(m) for m in bot.cache.get_members_view().values()),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="RSS of the gateway cache for a simulated shard, per cache profile")
+    parser.add_argument("--profile", choices=["minimal", "full"])
+    parser.add_argument("--members", action="store_true")
+    args = parser.parse_args()
+
+    if args.profile is not None:
+        # a single measurement, run in a fresh process so that profiles don't share heap
+        print(json.dumps(asyncio.run(simulate(args.profile, args.members))))
+        return
+
+    print(f"{GUILDS} guilds, {CHANNELS_PER_GUILD} channels and {ROLES_PER_GUILD} roles each, {MESSAGES} messages")
+    print(f"{'profile':<10} {'members':<8} {'RSS MB':>8} {'members cached':>15}  intents")
+    for members in (False, True):
+        for profile in ("full", "minimal"):
+            command = [sys.executable, __file__, "--profile", profile, *(["--members"] if members else [])]
+            output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+            # hikari may log to stdout first, the result is the last line
+            result = json.loads(output.splitlines()[-1])
+            print(
+                f"{profile:<10} {str(members):<8} {result['rss_mb']:>8.1f} {result['cached_members']:>15}  "
+                f"{result['intents']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import statistics
+import time
+import typing
+from types import SimpleNamespace
+
+from devenv import ExplainPool, clear_dataset, indexes, scans, seed_dataset, with_pool
+
+from modron.db import migrate
+from modron.db.cache import ModelCache
+from modron.db.characters import CharacterDB
+from modron.db.conn import Pool
+from modron.db.games import GameDB
+from modron.db.players import PlayerDB
+from modron.db.systems import SystemDB
+
+# the migration adding the foreign key and membership indexes, and the one reworking the system index.
+# later migrations make unrelated schema changes, so only these are applied
+INDEX_MIGRATIONS = ("foreign_key_indexes", "system_games_page_index")
+MIGRATIONS = [m for m in migrate.load() if m.name in INDEX_MIGRATIONS]
+ITERATIONS = 50
+DELETES = 10
+
+
+class DBs(typing.NamedTuple):
+    games: GameDB
+    systems: SystemDB
+    players: PlayerDB
+    characters: CharacterDB
+
+
+def dbs(pool: typing.Any) -> DBs:
+    cache = ModelCache(max_size=0)
+    return DBs(GameDB(pool, cache), SystemDB(pool, cache), PlayerDB(pool, cache), CharacterDB(pool, cache))
+
+
+Case = typing.Callable[[DBs], typing.Awaitable[typing.Any]]
+
+
+async def measure(pool: Pool, cases: dict[str, Case]) -> dict[str, tuple[float, str]]:
+    """
+    The median duration of each case in milliseconds, and a summary of the tables it read and how.
+    """
+    results: dict[str, tuple[float, str]] = {}
+    explain_pool = ExplainPool(pool, analyze=True)
+    explained = dbs(explain_pool)
+    timed = dbs(pool)
+
+    for name, case in cases.items():
+        explain_pool.plans.clear()
+        await case(explained)
+        plan = "; ".join(
+            f"{n['Relation Name']}: {n['Node Type']} {' '.join(indexes(n))}".strip()
+            for p in explain_pool.plans
+            for n in scans(p["Plan"])
+        )
+
+        samples: list[float] = []
+        for _ in range(ITERATIONS):
+            start = time.perf_counter()
+            await case(timed)
+            samples.append((time.perf_counter() - start) * 1000)
+
+        results[name] = (statistics.median(samples), plan)
+
+    return results
+
+
+async def measure_deletes(pool: Pool, game_ids: list[int]) -> float:
+    # deletes can't be repeated, so each sample removes a different game
+    games = dbs(pool).games
+    samples: list[float] = []
+    for game_id in game_ids:
+        start = time.perf_counter()
+        await games.delete(game_id=game_id)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def create_indexes(pool: Pool) -> None:
+    for migration in MIGRATIONS:
+        for statement in migration.statements:
+            await pool.execute(statement)
+
+
+@with_pool
+async def bench(pool: Pool):
+    print("seeding...")
+    guild_ids = await seed_dataset(pool, guilds=1000, systems_per_guild=5, games_per_system=10, characters_per_game=8)
+
+    try:
+        sample = await pool.fetchrow(
+            """
+            SELECT g.guild_id, g.game_id, g.system_id, g.author_id, p.user_id, p.character_id
+            FROM Games AS g
+            INNER JOIN Players AS p USING (game_id)
+            WHERE g.guild_id = $1
+            LIMIT 1;
+            """,
+            guild_ids.start + len(guild_ids) // 2,
+        )
+        assert sample is not None
+        deletable: list[int] = [
+            r["game_id"]
+            for r in await pool.fetch(
+                "SELECT game_id FROM Games WHERE guild_id = $1 LIMIT $2;", guild_ids.start, DELETES * 2
+            )
+        ]
+
+        guild_id, game_id, system_id, author_id, user_id, character_id = sample
+        ctx: typing.Any = SimpleNamespace(guild_id=guild_id, user=SimpleNamespace(id=user_id))
+        author_ctx: typing.Any = SimpleNamespace(guild_id=guild_id, user=SimpleNamespace(id=author_id))
+        option: typing.Any = SimpleNamespace(value="")
+
+        cases: dict[str, Case] = {
+            "GameDB.get": lambda db: db.games.get(game_id=game_id, guild_id=guild_id),
+            "SystemDB.get": lambda db: db.systems.get(system_id=system_id, guild_id=guild_id),
+            "PlayerDB.count": lambda db: db.players.count(game_id=game_id),
+            "CharacterDB.count": lambda db: db.characters.count(game_id=game_id),
+            "CharacterDB.get": lambda db: db.characters.get(character_id=character_id, guild_id=guild_id),
+            "GameDB.autocomplete_joinable": lambda db: db.games.autocomplete_joinable(ctx, option),
+            "GameDB.autocomplete_involved": lambda db: db.games.autocomplete_involved(author_ctx, option),
+        }
+
+        for name in (name for migration in MIGRATIONS for name in migration.concurrent_indexes):
+            await pool.execute(f"DROP INDEX IF EXISTS {name};")
+        await pool.execute("ANALYZE Games, Characters, Players;")
+        before = await measure(pool, cases)
+        before_delete = await measure_deletes(pool, deletable[:DELETES])
+
+        await create_indexes(pool)
+        await pool.execute("ANALYZE Games, Characters, Players;")
+        after = await measure(pool, cases)
+        after_delete = await measure_deletes(pool, deletable[DELETES:])
+
+        print(f"median of {ITERATIONS} runs ({DELETES} for deletes)")
+        print(f"{'query':<32} {'before ms':>10} {'after ms':>10}")
+        for name in cases:
+            print(f"{name:<32} {before[name][0]:>10.3f} {after[name][0]:>10.3f}")
+        print(f"{'GameDB.delete':<32} {before_delete:>10.3f} {after_delete:>10.3f}")
+
+        print("\nplans")
+        for name in cases:
+            print(f"{name}\n  before: {before[name][1]}\n  after:  {after[name][1]}")
+    finally:
+        # make sure the indexes exist again even if the benchmark failed part way
+        await create_indexes(pool)
+        await clear_dataset(pool, guild_ids)
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    asyncio.run(bench())
@@ -0,0 +1,99 @@
+import os
+import sys
+
+sys.path.insert(0, os.getcwd())
+
+import asyncio
+import itertools
+import random
+
+from modron.reposter import MenuReposter
+
+# feedback posted to one channel, at random intervals
+POSTS = 10
+# seconds between posts, on average. a minute of traffic, sped up
+POST_INTERVAL = 0.3
+# seconds per REST call
+LATENCY = 0.05
+# repost delays to compare, in seconds. None moves the menu straight away, as before
+DELAYS: list[float | None] = [None, 0.0, 0.5, 1.0, 3.0]
+
+
+class FakeChannel:
+    """
+    A channel of messages, with the menu recorded the way `MenuDB` records it. Counts the REST calls made.
+    """
+
+    def __init__(self) -> None:
+        self.ids = itertools.count()
+        self.messages: list[tuple[int, str]] = []
+        self.menu_id: int | None = None
+        self.calls = 0
+
+    async def create(self, kind: str) -> int:
+        self.calls += 1
+        await asyncio.sleep(LATENCY)
+        message_id = next(self.ids)
+        self.messages.append((message_id, kind))
+        return message_id
+
+    async def delete(self, message_id: int) -> None:
+        self.calls += 1
+        await asyncio.sleep(LATENCY)
+        self.messages = [m for m in self.messages if m[0] != message_id]
+
+    async def move_menu(self) -> None:
+        if self.menu_id is not None:
+            await self.delete(self.menu_id)
+        self.menu_id = await self.create("menu")
+
+    @property
+    def menus(self) -> int:
+        return sum(kind == "menu" for _, kind in self.messages)
+
+    @property
+    def menu_last(self) -> bool:
+        return bool(self.messages) and self.messages[-1][1] == "menu"
+
+
+async def post(channel: FakeChannel, reposter: MenuReposter | None, tasks: list[asyncio.Task[None]]) -> None:
+    await channel.create("feedback")
+    if reposter is None:
+        # each interaction moved the menu itself, concurrently with any other
+        tasks.append(asyncio.create_task(channel.move_menu()))
+    else:
+        reposter.request(0, channel.move_menu)
+
+
+async def run(delay: float | None) -> FakeChannel:
+    channel = FakeChannel()
+    await channel.move_menu()
+    channel.calls = 0
+
+    reposter = MenuReposter(delay) if delay is not None else None
+    rng = random.Random(0)
+    tasks: list[asyncio.Task[None]] = []
+    for _ in range(POSTS):
+        tasks.append(asyncio.create_task(post(channel, reposter, tasks)))
+        await asyncio.sleep(rng.expovariate(1 / POST_INTERVAL))
+
+    await asyncio.gather(*tasks)
+    if reposter is not None:
+        # closing runs the last scheduled move straight away, leaving the menu last
+        await reposter.close()
+    return channel
+
+
+async def bench():
+    print(f"{POSTS} posts about {POST_INTERVAL}s apart, {LATENCY}s per REST call")
+    print(f"{'delay':<10} {'menu calls':>10} {'menus left':>10} {'menu last':>10}")
+    for delay in DELAYS:
+        channel = await run(delay)
+        # every post creates its own message, the rest are the menu's
+        calls = channel.calls - POSTS
+        name = "before" if delay is None else f"{delay}s"
+        print(f"{name:<10} {calls:>10} {channel.menus:>10} {str(channel.menu_last):>10}")
+
+
+if __name__ == "__main__":
+    asyncio.run(bench())
@@ -0,0 +1,172 @@
+import os
+import sys
+
+sys.path.insert(0, os.getcwd())
+
+import asyncio
+import collections
+import math
+import random
+import types
+import typing
+from datetime import datetime
+
+import hikari
+
+from modron.db.games import GameDB
+from modron.fabricate import MEMBERS_PER_PAGE, Fabricator
+from modron.models import Game, GameStatus, Player
+
+GUILD_ID = hikari.Snowflake(1)
+APP_ID = hikari.Snowflake(2)
+OLD_ROLE = hikari.Snowflake(3)
+NEW_ROLE = hikari.Snowflake(4)
+# members of the guild, most of them not in the game
+GUILD_SIZE = 5000
+SIZES = [5, 25, 100, 500]
+
+
+class FakeGuild:
+    """
+    Stands in for both the REST client and the gateway cache, counting the requests made.
+    Role changes are applied, so the guild stays consistent with what a sync did.
+    Without `members_cached`, the cache holds the guild but not its members, as without the members intent.
+    """
+
+    def __init__(self, roles: dict[hikari.Snowflake, set[hikari.Snowflake]], members_cached: bool) -> None:
+        self.roles = roles
+        self.members_cached = members_cached
+        self.calls: collections.Counter[str] = collections.Counter()
+
+    def member(self, user_id: hikari.Snowflake) -> typing.Any:
+        return types.SimpleNamespace(id=user_id, role_ids=list(self.roles[user_id]))
+
+    def get_guild(self, guild_id: hikari.Snowflake) -> typing.Any:
+        return types.SimpleNamespace(id=guild_id, member_count=len(self.roles))
+
+    def get_member(self, guild_id: hikari.Snowflake, user_id: hikari.Snowflake) -> typing.Any:
+        return self.member(user_id) if self.members_cached and user_id in self.roles else None
+
+    async def add_role_to_member(self, guild_id: hikari.Snowflake, user_id: hikari.Snowflake, role_id: int) -> None:
+        self.calls["add"] += 1
+        self.roles[user_id].add(hikari.Snowflake(role_id))
+
+    async def remove_role_from_member(
+        self, guild_id: hikari.Snowflake, user_id: hikari.Snowflake, role_id: int
+    ) -> None:
+        self.calls["remove"] += 1
+        self.roles[user_id].discard(hikari.Snowflake(role_id))
+
+    async def fetch_members(self, guild_id: hikari.Snowflake) -> typing.AsyncIterator[typing.Any]:
+        for i, user_id in enumerate(self.roles):
+            if i % MEMBERS_PER_PAGE == 0:
+                self.calls["list"] += 1
+            yield self.member(user_id)
+
+
+def game(players: int, role_id: hikari.Snowflake) -> Game:
+    return Game(
+        game_id=1,
+        guild_id=GUILD_ID,
+        author_id=hikari.Snowflake(1000),
+        name="game",
+        status=GameStatus.RUNNING,
+        seeking_players=False,
+        created_at=datetime.now(),
+        role_id=role_id,
+        category_channel_id=None,
+        main_channel_id=None,
+        info_channel_id=None,
+        synopsis_channel_id=None,
+        voice_channel_id=None,
+        characters=(),
+        players=tuple(Player(user_id=hikari.Snowflake(1000 + i), game_id=1) for i in range(1, players + 1)),
+    )
+
+
+def guild(g: Game, holders: int, members_cached: bool) -> FakeGuild:
+    """
+    A guild holding the game's roster, where the author and the first `holders` players have the game's role.
+    """
+    roster = [g.author_id, *(p.user_id for p in g.players)]
+    others = [hikari.Snowflake(100_000 + i) for i in range(GUILD_SIZE - len(roster))]
+    members = roster + others
+    # the roster is spread through the guild, as it would be when listing members
+    random.Random(len(roster)).shuffle(members)
+    roles = {user_id: set[hikari.Snowflake]() for user_id in members}
+    assert g.role_id is not None
+    for user_id in roster[: holders + 1]:
+        roles[user_id].add(g.role_id)
+    return FakeGuild(roles, members_cached)
+
+
+async def before(fab: Fabricator, action: str, g: Game) -> None:
+    """
+    The calls made before roles were synced, kept for comparison: every member of the roster, every time.
+    """
+    roster = [g.author_id, *(p.user_id for p in g.players)]
+
+    async def add(role_id: hikari.Snowflake) -> None:
+        await asyncio.gather(*(fab.client.add_role_to_member(g.guild_id, u, role_id) for u in roster))
+
+    async def remove(role_id: hikari.Snowflake) -> None:
+        await asyncio.gather(*(fab.client.remove_role_from_member(g.guild_id, u, role_id) for u in roster))
+
+    if action == "change role":
+        await remove(OLD_ROLE)
+        await add(NEW_ROLE)
+    elif action == "reselect role":
+        await remove(OLD_ROLE)
+        await add(OLD_ROLE)
+    else:
+        await add(OLD_ROLE)
+
+
+async def synced(fab: Fabricator, action: str, g: Game) -> None:
+    if action == "change role":
+        await fab.sync_role(game(len(g.players), NEW_ROLE), OLD_ROLE)
+    elif action == "reselect role":
+        await fab.sync_role(g, OLD_ROLE)
+    else:
+        await fab.apply_role(g)
+
+
+async def bench():
+    print(f"REST calls for a game in a guild of {GUILD_SIZE} members, {MEMBERS_PER_PAGE} listed per request")
+    print(f"{'action':<15} {'players':>7} {'before':>7} {'gateway':>8} {'listing':>8} {'neither':>8}")
+
+    # (action, how many players already hold the game's role)
+    actions: list[tuple[str, typing.Callable[[int], int]]] = [
+        ("add player", lambda n: n - 1),
+        ("resync", lambda n: n),
+        ("change role", lambda n: n),
+        ("reselect role", lambda n: n),
+    ]
+    for action, holders in actions:
+        for size in SIZES:
+            counts: list[int] = []
+            for name, members_cached, listed in [
+                ("before", False, False),
+                ("gateway", True, False),
+                ("listing", False, True),
+                ("neither", False, False),
+            ]:
+                g = game(size, OLD_ROLE)
+                fake = guild(g, holders(size), members_cached)
+                client = typing.cast(hikari.api.RESTClient, fake)
+                cache = typing.cast(hikari.api.Cache, fake)
+                fab = Fabricator(APP_ID, typing.cast(GameDB, None), client, cache, list_members=listed)
+                await (before if name == "before" else synced)(fab, action, g)
+                counts.append(fake.calls.total())
+
+            print(f"{action:<15} {size:>7} {counts[0]:>7} {counts[1]:>8} {counts[2]:>8} {counts[3]:>8}")
+
+    print(
+        f"listing is {math.ceil(GUILD_SIZE / MEMBERS_PER_PAGE)} requests, or fewer once the roster is found. "
+        "it is skipped when calling every member would take fewer"
+    )
+    print("gateway and listing both need gateway.members. without it, as by default, a sync makes the neither calls")
+
+
+if __name__ == "__main__":
+    asyncio.run(bench())
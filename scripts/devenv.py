@@ -3,13 +3,17 @@ import sys
 
 sys.path.insert(0, os.getcwd())
 
+import contextlib
 import functools
+import json
 import typing
 from pathlib import Path
 
 import hikari
 
 from modron.config import Config
+from modron.db import migrate
+from modron.db.conn import Pool, connect
 from modron.model import Model
 
 ReturnT = typing.TypeVar("ReturnT")
@@ -18,6 +22,7 @@ SpecT = typing.ParamSpec("SpecT")
 SigT = typing.Callable[
     typing.Concatenate[hikari.api.RESTClient, InjectedT, SpecT], typing.Coroutine[typing.Any, typing.Any, ReturnT]
 ]
+PoolSigT = typing.Callable[typing.Concatenate[Pool, SpecT], typing.Coroutine[typing.Any, typing.Any, ReturnT]]
 OutSigT = typing.Callable[SpecT, typing.Coroutine[typing.Any, typing.Any, ReturnT]]
 
 
@@ -42,12 +47,236 @@ def with_model(f: SigT[Model, SpecT, ReturnT]) -> OutSigT[SpecT, ReturnT]:
     return inner
 
 
+def with_pool(f: PoolSigT[SpecT, ReturnT]) -> OutSigT[SpecT, ReturnT]:
+    """
+    Like `with_model`, but only connects to the database. Useful for scripts that don't need discord.
+    """
+
+    @functools.wraps(f)
+    async def inner(*args: SpecT.args, **kwargs: SpecT.kwargs) -> ReturnT:
+        config = Config.load(Path("dev.config.yml"))
+        pool = await connect(config.db_url, config.pool)
+
+        try:
+            return await f(pool, *args, **kwargs)
+        finally:
+            await pool.close()
+
+    return inner
+
+
 async def reset_schema(model: Model):
+    await model.db_pool.execute("DROP TABLE IF EXISTS FeedbackMenus;")
     await model.db_pool.execute("DROP TABLE IF EXISTS Players;")
     await model.db_pool.execute("DROP TABLE IF EXISTS Characters;")
     await model.db_pool.execute("DROP TABLE IF EXISTS Games;")
     await model.db_pool.execute("DROP TABLE IF EXISTS Systems;")
     await model.db_pool.execute("DROP TYPE IF EXISTS game_status;")
+    await model.db_pool.execute("DROP TABLE IF EXISTS schema_version;")
+
+    await migrate.apply(model.db_pool)
+
+
+async def seed_game(pool: Pool, *, guild_id: int, players: int, characters: int) -> int:
+    """
+    Insert a game with the given number of players and characters. Returns the new game_id.
+    User ids are derived from the game_id so that seeded games never share players.
+    """
+    game_id: int = await pool.fetchval(
+        """
+        INSERT INTO Games (name, abbreviation, guild_id, author_id)
+        VALUES ('seed-' || gen_random_uuid(), 'seed', $1, 1)
+        RETURNING game_id;
+        """,
+        guild_id,
+    )
+    await pool.execute(
+        """
+        INSERT INTO Characters (game_id, author_id, name)
+        SELECT $1, $1::int::bigint * 100000 + n, 'character ' || n
+        FROM generate_series(1, $2) AS n;
+        """,
+        game_id,
+        characters,
+    )
+    await pool.execute(
+        """
+        INSERT INTO Players (user_id, game_id)
+        SELECT $1::int::bigint * 100000 + n, $1
+        FROM generate_series(1, $2) AS n;
+        """,
+        game_id,
+        players,
+    )
+    return game_id
+
+
+SEED_GUILD_BASE = 1_000_000
+SEED_USERS_PER_GUILD = 200
+
+
+async def seed_dataset(
+    pool: Pool,
+    *,
+    guilds: int,
+    systems_per_guild: int,
+    games_per_system: int,
+    characters_per_game: int,
+) -> range:
+    """
+    Insert a synthetic dataset spread across many guilds. Returns the range of seeded guild ids.
+    Every character is assigned to a player, and users are shared between the games of a guild.
+    """
+    guild_ids = range(SEED_GUILD_BASE + 1, SEED_GUILD_BASE + guilds + 1)
+    await pool.execute(
+        """
+        INSERT INTO Systems (guild_id, name, abbreviation, author_label, player_label)
+        SELECT
+            guild_id,
+            'system ' || substr(md5(random()::text), 1, 20),
+            substr(md5(random()::text), 1, 10),
+            'GM',
+            'Player'
+        FROM generate_series($1::bigint, $2::bigint) AS guild_id, generate_series(1, $3);
+        """,
+        guild_ids.start,
+        guild_ids.stop - 1,
+        systems_per_guild,
+    )
+    await pool.execute(
+        """
+        INSERT INTO Games (system_id, guild_id, author_id, name, abbreviation, seeking_players)
+        SELECT
+            s.system_id,
+            s.guild_id,
+            s.guild_id * 1000 + (random() * $3)::int,
+            'game ' || substr(md5(random()::text), 1, 30),
+            substr(md5(random()::text), 1, 15),
+            random() < 0.2
+        FROM Systems AS s, generate_series(1, $4)
+        WHERE s.guild_id BETWEEN $1 AND $2;
+        """,
+        guild_ids.start,
+        guild_ids.stop - 1,
+        SEED_USERS_PER_GUILD,
+        games_per_system,
+    )
+    await pool.execute(
+        """
+        INSERT INTO Characters (game_id, author_id, name)
+        SELECT
+            g.game_id,
+            g.guild_id * 1000 + (random() * $3)::int,
+            'character ' || substr(md5(random()::text), 1, 20)
+        FROM Games AS g, generate_series(1, $4)
+        WHERE g.guild_id BETWEEN $1 AND $2;
+        """,
+        guild_ids.start,
+        guild_ids.stop - 1,
+        SEED_USERS_PER_GUILD,
+        characters_per_game,
+    )
+    await pool.execute(
+        """
+        INSERT INTO Players (user_id, game_id, character_id)
+        SELECT c.author_id, c.game_id, c.character_id
+        FROM Characters AS c
+        INNER JOIN Games AS g USING (game_id)
+        WHERE g.guild_id BETWEEN $1 AND $2
+        ON CONFLICT (user_id, game_id)
+            DO NOTHING;
+        """,
+        guild_ids.start,
+        guild_ids.stop - 1,
+    )
+    await pool.execute("ANALYZE Systems, Games, Characters, Players;")
+    return guild_ids
+
+
+async def clear_dataset(pool: Pool, guild_ids: range) -> None:
+    """
+    Delete a dataset created by `seed_dataset`.
+    Tables are cleared children first, so that foreign key actions don't scan for rows one parent at a time.
+    """
+    games = "SELECT game_id FROM Games WHERE guild_id BETWEEN $1 AND $2"
+    statements = [
+        f"DELETE FROM Players WHERE game_id IN ({games});",
+        "VACUUM Players;",
+        f"DELETE FROM Characters WHERE game_id IN ({games});",
+        "VACUUM Characters;",
+        "DELETE FROM Games WHERE guild_id BETWEEN $1 AND $2;",
+        "VACUUM Games;",
+        "DELETE FROM Systems WHERE guild_id BETWEEN $1 AND $2;",
+    ]
+    for statement in statements:
+        if "$1" in statement:
+            await pool.execute(statement, guild_ids.start, guild_ids.stop - 1)
+        else:
+            await pool.execute(statement)
+
+
+Plan = dict[str, typing.Any]
+
+
+class ExplainConn:
+    """
+    Stands in for a pooled connection, recording the plan of every query before running it.
+    """
+
+    def __init__(self, conn: typing.Any, plans: list[Plan], analyze: bool) -> None:
+        self.conn = conn
+        self.plans = plans
+        self.options = "ANALYZE, FORMAT JSON" if analyze else "FORMAT JSON"
+
+    async def explain(self, query: str, *args: typing.Any) -> None:
+        plan = await self.conn.fetchval(f"EXPLAIN ({self.options}) {query}", *args)
+        self.plans.append(json.loads(plan)[0])
+
+    async def fetch(self, query: str, *args: typing.Any) -> typing.Any:
+        await self.explain(query, *args)
+        return await self.conn.fetch(query, *args)
+
+    async def fetchrow(self, query: str, *args: typing.Any) -> typing.Any:
+        await self.explain(query, *args)
+        return await self.conn.fetchrow(query, *args)
+
+    async def fetchval(self, query: str, *args: typing.Any) -> typing.Any:
+        await self.explain(query, *args)
+        return await self.conn.fetchval(query, *args)
+
+
+class ExplainPool:
+    """
+    Pass to a DB class in place of its pool to collect the plans of the queries it runs.
+    Only for reads: with `analyze=True`, each query is executed twice.
+    """
+
+    def __init__(self, pool: Pool, *, analyze: bool = False) -> None:
+        self.pool = pool
+        self.analyze = analyze
+        self.plans: list[Plan] = []
+
+    @contextlib.asynccontextmanager
+    async def acquire(self) -> typing.AsyncIterator[ExplainConn]:
+        async with self.pool.acquire() as conn:
+            yield ExplainConn(conn, self.plans, self.analyze)
+
+
+def scans(plan: Plan) -> typing.Iterator[Plan]:
+    """
+    Every node of a plan that reads a table.
+    """
+    if "Relation Name" in plan:
+        yield plan
+    for child in plan.get("Plans", []):
+        yield from scans(child)
+
 
-    with open(Path("modron/db/schema.sql")) as f:
-        await model.db_pool.execute(f.read())
+def indexes(plan: Plan) -> typing.Iterator[str]:
+    """
+    Every index used by a plan.
+    """
+    if "Index Name" in plan:
+        yield plan["Index Name"]
+    for child in plan.get("Plans", []):
+        yield from indexes(child)
@@ -0,0 +1,85 @@
+import sys
+import typing
+from types import SimpleNamespace
+
+from devenv import ExplainPool, clear_dataset, indexes, scans, seed_dataset, with_pool
+
+from modron.db.cache import ModelCache
+from modron.db.characters import CharacterDB
+from modron.db.conn import Pool
+from modron.db.games import GameDB
+from modron.db.systems import SystemDB
+
+
+def fake_member(user_id: int, *, manager: bool) -> typing.Any:
+    # enough of a hikari.Member for toolbox.members.calculate_permissions
+    guild = SimpleNamespace(
+        owner_id=user_id if manager else 0, id=0, get_roles=lambda: {0: SimpleNamespace(id=0, permissions=0)}
+    )
+    return SimpleNamespace(id=user_id, role_ids=[], get_guild=lambda: guild)
+
+
+@with_pool
+async def explain(pool: Pool) -> bool:
+    guild_ids = await seed_dataset(pool, guilds=200, systems_per_guild=5, games_per_system=10, characters_per_game=8)
+
+    try:
+        explain_pool = ExplainPool(pool)
+        cache = ModelCache(max_size=0)
+        games = GameDB(typing.cast(Pool, explain_pool), cache)
+        systems = SystemDB(typing.cast(Pool, explain_pool), cache)
+        characters = CharacterDB(typing.cast(Pool, explain_pool), cache)
+
+        guild_id = guild_ids.start
+        user_id = guild_id * 1000 + 1
+        option = SimpleNamespace(value="a")
+
+        def ctx(*, manager: bool = False) -> typing.Any:
+            return SimpleNamespace(
+                guild_id=guild_id, user=SimpleNamespace(id=user_id), member=fake_member(user_id, manager=manager)
+            )
+
+        # each autocomplete query, and the table it completes from
+        cases: list[tuple[str, str, typing.Callable[[], typing.Awaitable[typing.Any]]]] = [
+            ("GameDB.autocomplete_guild", "games", lambda: games.autocomplete_guild(ctx(), option)),
+            (
+                "GameDB.autocomplete_editable (manager)",
+                "games",
+                lambda: games.autocomplete_editable(ctx(manager=True), option),
+            ),
+            ("GameDB.autocomplete_editable", "games", lambda: games.autocomplete_editable(ctx(), option)),
+            ("GameDB.autocomplete_joinable", "games", lambda: games.autocomplete_joinable(ctx(), option)),
+            ("GameDB.autocomplete_joined", "games", lambda: games.autocomplete_joined(ctx(), option)),
+            ("GameDB.autocomplete_involved", "games", lambda: games.autocomplete_involved(ctx(), option)),
+            ("SystemDB.autocomplete", "systems", lambda: systems.autocomplete(ctx(), option)),
+            (
+                "CharacterDB.autocomplete_viewable",
+                "characters",
+                lambda: characters.autocomplete_viewable(ctx(), option),
+            ),
+            (
+                "CharacterDB.autocomplete_editable",
+                "characters",
+                lambda: characters.autocomplete_editable(ctx(), option),
+            ),
+        ]
+
+        ok = True
+        for name, relation, run in cases:
+            explain_pool.plans.clear()
+            await run()
+            nodes = [s for plan in explain_pool.plans for s in scans(plan["Plan"]) if s["Relation Name"] == relation]
+            uses_index = len(nodes) > 0 and all(n["Node Type"] != "Seq Scan" for n in nodes)
+            ok = ok and uses_index
+            described = ", ".join(f"{n['Node Type']} ({' '.join(indexes(n)) or 'no index'})" for n in nodes)
+            print(f"{'ok  ' if uses_index else 'FAIL'} {name}: {described}")
+
+        return ok
+    finally:
+        await clear_dataset(pool, guild_ids)
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    sys.exit(0 if asyncio.run(explain()) else 1)